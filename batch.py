@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+from main import SOLVERS, find_endpoints, load_grid, positive_int
+
+
+def maze_files(source):
+    """Yield maze files from a directory of ``.txt``/``.maze`` files or a manifest listing one path per line."""
+    source = Path(source)
+    if source.is_dir():
+        for entry in sorted(os.scandir(source), key=lambda entry: entry.name):
+            if entry.is_file() and entry.name.endswith((".txt", ".maze")):
+                yield entry.path
+        return
+
+    with open(source, "r") as manifest:
+        for line in manifest:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield str(source.parent / line)
+
+
+def solve_file(maze_file, solver_name, stats=False, skip_unsolvable=False):
+    try:
+        grid = load_grid(maze_file)
+        start, end = find_endpoints(grid)
+        solver = SOLVERS[solver_name](grid, start, end)
+    except (OSError, ValueError, IndexError) as error:
+        return {"maze": maze_file, "solver": solver_name, "error": str(error)}
+
+    if skip_unsolvable and not grid.connected(start, end):
+        return {
+            "maze": maze_file,
+            "solver": solver_name,
+            "skipped": "unsolvable",
+            "start_component": grid.component_size(start),
+            "end_component": grid.component_size(end),
+        }
+
+    began = time.perf_counter()
+    path, explored = solver.search()
+    result = {
+        "maze": maze_file,
+        "solver": solver_name,
+        "path_length": len(path),
+        "explored": len(explored),
+        "seconds": time.perf_counter() - began,
+    }
+    if stats:
+        result["counters"] = solver.counters
+        result["phases"] = solver.phases
+    return result
+
+
+def solve_chunk(chunk, solver_name, stats=False, skip_unsolvable=False):
+    return [solve_file(maze_file, solver_name, stats, skip_unsolvable) for maze_file in chunk]
+
+
+def chunked(items, size):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def run(files, solver_name, out, workers=None, chunk_size=16, max_in_flight=None, stats=False, skip_unsolvable=False):
+    """Solve ``files`` across a process pool, writing one JSON line per maze to ``out``.
+
+    Files are submitted in chunks and at most ``max_in_flight`` chunks are queued
+    at once, so memory stays flat however many mazes there are. Results are
+    written in completion order; with ``stats`` they include the solver's
+    counters and phase times. With ``skip_unsolvable`` every maze is labelled
+    into connected components first, and mazes whose start and end are apart
+    get a "skipped" record instead of a search. Returns the number of mazes
+    handled.
+    """
+    workers = workers or os.cpu_count()
+    max_in_flight = max_in_flight or 2 * workers
+    solved = 0
+
+    def write(done):
+        nonlocal solved
+        for future in done:
+            for result in future.result():
+                out.write(json.dumps(result) + "\n")
+                solved += 1
+        out.flush()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for chunk in chunked(files, chunk_size):
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                write(done)
+            pending.add(pool.submit(solve_chunk, chunk, solver_name, stats, skip_unsolvable))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            write(done)
+
+    return solved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve many maze files in parallel.")
+    parser.add_argument("source", help="directory of .txt/.maze mazes, or a manifest file listing one maze per line")
+    parser.add_argument("--solver", default="Dijkstra", choices=SOLVERS)
+    parser.add_argument("--out", help="JSONL results file (default stdout)")
+    parser.add_argument("--workers", type=positive_int, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=positive_int, default=16, help="mazes per submitted task")
+    parser.add_argument("--max-in-flight", type=positive_int, help="submitted chunks not yet written (default 2 x workers)")
+    parser.add_argument("--stats", action="store_true", help="add solver counters and phase times to every result")
+    parser.add_argument("--skip-unsolvable", action="store_true", help="check connectivity first and skip mazes with no path")
+    args = parser.parse_args(argv)
+
+    out = open(args.out, "w") if args.out else sys.stdout
+    try:
+        began = time.perf_counter()
+        solved = run(
+            maze_files(args.source),
+            args.solver,
+            out,
+            args.workers,
+            args.chunk_size,
+            args.max_in_flight,
+            args.stats,
+            args.skip_unsolvable,
+        )
+        print(f"Solved {solved} mazes in {time.perf_counter() - began:.2f}s", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from termcolor import cprint
+import gen
+import kernels
+from logic import Grid
+from main import SOLVERS, find_endpoints, positive_int
+
+# Solvers implemented in logic.py; others (e.g. the caching Oracle) can be asked for by name
+DEFAULT_SOLVERS = [name for name, solver in SOLVERS.items() if solver.__module__ == "logic"]
+DEFAULT_SIZES = ["101x101", "501x501"]
+KERNEL_SOLVERS = ["aStar", "Dijkstra", "DeadEndFilling"]  # Solvers with a loop in kernels.py
+
+COLUMNS = [
+    ("generator", "{:<12}"),
+    ("size", "{:>10}"),
+    ("seed", "{:>5}"),
+    ("solver", "{:<22}"),
+    ("seconds", "{:>9.4f}"),
+    ("explored", "{:>9}"),
+    ("peak_kib", "{:>9.0f}"),
+    ("path_length", "{:>11}"),
+]
+
+
+def parse_size(size):
+    height, width = size.lower().split("x")
+    return int(height), int(width)
+
+
+def measure(maze, solver_name, repeat=1):
+    """Time and profile one solver on ``maze`` (a list of row strings).
+
+    Every run gets a fresh ``Grid``, so per-grid caches such as the JPS+ jump
+    tables are part of the cost. The time is the best of ``repeat`` runs; peak
+    memory comes from one extra run under tracemalloc, which slows it down.
+
+    tracemalloc does not see the arrays Numba allocates inside a kernel (the
+    closed set and the heap), so with kernels in use ``peak_kib`` under-reports
+    aStar, Dijkstra and DeadEndFilling on grids of ``kernels.MIN_CELLS`` cells
+    or more. Set ``MAZE_KERNELS=0`` to compare their memory.
+    """
+    start, end = find_endpoints(Grid(maze))
+    solver_class = SOLVERS[solver_name]
+
+    seconds = []
+    for _ in range(repeat):
+        grid = Grid(maze)
+        began = time.perf_counter()
+        path, explored = solver_class(grid, start, end).search()
+        seconds.append(time.perf_counter() - began)
+
+    grid = Grid(maze)
+    tracemalloc.start()
+    try:
+        solver_class(grid, start, end).search()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds": min(seconds),
+        "explored": len(explored),
+        "peak_kib": peak / 1024,
+        "path_length": len(path),
+    }
+
+
+def mazes(generators, sizes, seeds, terrain=0):
+    """Yield ``(generator, size, seed, maze)`` for every combination."""
+    for generator in generators:
+        for size in sizes:
+            height, width = parse_size(size)
+            for seed in seeds:
+                maze = gen.GENERATORS[generator](height, width, seed)
+                if terrain:
+                    maze = gen.add_terrain(maze, terrain, seed=seed)
+                yield generator, size, seed, maze
+
+
+def run(generators, sizes, seeds, solvers, repeat=1, terrain=0):
+    """Yield one result record per generator, size, seed and solver."""
+    for generator, size, seed, maze in mazes(generators, sizes, seeds, terrain):
+        for solver_name in solvers:
+            record = {"generator": generator, "size": size, "seed": seed, "solver": solver_name}
+            try:
+                record.update(measure(maze, solver_name, repeat))
+            except ValueError as error:
+                record["error"] = str(error)  # E.g. a unit-cost solver on a weighted maze
+            yield record
+
+
+def parity(generators, sizes, seeds, terrain=0):
+    """Solve every maze with and without ``kernels`` and yield the mismatches.
+
+    Paths, expansion order and counters must all be identical. Without Numba
+    the kernels run interpreted, so keep the mazes small.
+    """
+    saved = kernels.enabled, kernels.MIN_CELLS
+    kernels.MIN_CELLS = 0
+    try:
+        for generator, size, seed, maze in mazes(generators, sizes, seeds, terrain):
+            grid = Grid(maze)
+            start, end = find_endpoints(grid)
+            for solver_name in KERNEL_SOLVERS:
+                results = []
+                for enabled in (False, True):
+                    kernels.enabled = enabled
+                    solver = SOLVERS[solver_name](grid, start, end)
+                    path, explored = solver.search()
+                    results.append((path, explored.indices, solver.counters))
+                if results[0] != results[1]:
+                    yield generator, size, seed, solver_name, len(results[0][0]), len(results[1][0])
+    finally:
+        kernels.enabled, kernels.MIN_CELLS = saved
+
+
+def format_row(record):
+    """One table line; missing values (failed runs) are shown as ``-``."""
+    cells = []
+    for name, fmt in COLUMNS:
+        value = record.get(name, "-")
+        cells.append((fmt if name in record else _plain(fmt)).format(value))
+    return " ".join(cells)
+
+
+def _plain(fmt):
+    """``fmt`` without its number formatting, for headers and placeholders."""
+    return fmt.replace(".4f", "").replace(".0f", "")
+
+
+def key(record):
+    return record["generator"], record["size"], record["seed"], record["solver"]
+
+
+def compare(results, baseline, threshold=0.2, min_seconds=0.005):
+    """Regressions of ``results`` against ``baseline`` runs, as ``(record, message)`` pairs.
+
+    Time and peak memory regress when they grow by more than ``threshold``
+    (times also by more than ``min_seconds``, to ignore timer noise); explored
+    cells regress on any growth, and a changed path length is always flagged.
+    Memory growth inside Numba kernels is invisible here (see ``measure``).
+    """
+    previous = {key(record): record for record in baseline if "error" not in record}
+    regressions = []
+    for record in results:
+        old = previous.get(key(record))
+        if old is None or "error" in record:
+            continue
+        if record["path_length"] != old["path_length"]:
+            regressions.append((record, f"path length {old['path_length']} -> {record['path_length']}"))
+        if record["explored"] > old["explored"]:
+            regressions.append((record, f"explored {old['explored']} -> {record['explored']}"))
+        if record["seconds"] > old["seconds"] * (1 + threshold) and record["seconds"] - old["seconds"] > min_seconds:
+            regressions.append((record, f"time {old['seconds']:.4f}s -> {record['seconds']:.4f}s"))
+        if record["peak_kib"] > old["peak_kib"] * (1 + threshold):
+            regressions.append((record, f"peak memory {old['peak_kib']:.0f} -> {record['peak_kib']:.0f} KiB"))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the solvers on seeded generated mazes.")
+    parser.add_argument("--generators", nargs="+", default=list(gen.GENERATORS), choices=gen.GENERATORS)
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="HEIGHTxWIDTH, both odd (default %(default)s)")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1])
+    parser.add_argument("--solvers", nargs="+", default=DEFAULT_SOLVERS, choices=SOLVERS)
+    parser.add_argument("--repeat", type=positive_int, default=3, help="timed runs per solver; the best is kept")
+    parser.add_argument(
+        "--terrain", type=int, default=0, choices=[0, *range(2, 10)], metavar="MAX_COST", help="add terrain costs 2..MAX_COST"
+    )
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against a JSON file from --json")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative growth of time and memory")
+    parser.add_argument("--parity", action="store_true", help="check that kernels.py matches the pure-Python solvers")
+    args = parser.parse_args(argv)
+
+    if args.parity:
+        if not kernels.AVAILABLE:
+            cprint("Numba is not installed; checking the interpreted kernels", "yellow")
+        mismatches = list(parity(args.generators, args.sizes, args.seeds, args.terrain))
+        for generator, size, seed, solver_name, python_length, kernel_length in mismatches:
+            cprint(f"MISMATCH {generator} {size} {seed} {solver_name}: path {python_length} vs {kernel_length}", "red")
+        if mismatches:
+            sys.exit(1)
+        cprint(f"Kernels match for {', '.join(KERNEL_SOLVERS)}", "green")
+        return
+
+    print(" ".join(_plain(fmt).format(name) for name, fmt in COLUMNS))
+    results = []
+    for record in run(args.generators, args.sizes, args.seeds, args.solvers, args.repeat, args.terrain):
+        results.append(record)
+        print(format_row(record) + (f"  ({record['error']})" if "error" in record else ""), flush=True)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": results}, file, indent=1)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for record, message in regressions:
+            cprint(f"REGRESSION {' '.join(map(str, key(record)))}: {message}", "red")
+        if regressions:
+            sys.exit(1)
+        cprint("No regressions", "green")
+
+
+if __name__ == "__main__":
+    main()
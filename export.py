@@ -0,0 +1,260 @@
+import argparse
+import os
+import shutil
+import sys
+import time
+import numpy as np
+from termcolor import cprint
+import logic
+from main import (
+    BACKWARD_EXPLORED_COLOR,
+    BLACK,
+    END_COLOR,
+    EXPLORED_COLOR,
+    PATH_COLOR,
+    SOLVERS,
+    START_COLOR,
+    TERRAIN_COLORS,
+    WHITE,
+    positive_int,
+    solve,
+)
+
+# Frames hold palette indices; the writers turn them into colours
+PALETTE = np.array(
+    [BLACK, WHITE, START_COLOR, END_COLOR, EXPLORED_COLOR, BACKWARD_EXPLORED_COLOR, PATH_COLOR, *TERRAIN_COLORS.values()],
+    dtype=np.uint8,
+)
+CELL_CODES = {"#": 0, ".": 1, "S": 2, "E": 3, **{cost: 7 + i for i, cost in enumerate(TERRAIN_COLORS)}}
+EXPLORED, BACKWARD, PATH = 4, 5, 6
+
+
+class Canvas:
+    """The animation frame, kept as one palette index per pixel and painted in place.
+
+    ``pixels`` is the same array for the whole animation; ``paint`` changes
+    only the given cells and returns the pixel box ``(top, bottom, left,
+    right)`` around them, so writers only need to re-encode that part.
+    """
+
+    def __init__(self, grid, cell_size=1):
+        table = np.full(256, CELL_CODES["."], dtype=np.uint8)
+        for cell, code in CELL_CODES.items():
+            table[ord(cell)] = code
+        cells = table[np.frombuffer(grid.cells, dtype=np.uint8)].reshape(grid.rows + 2, grid.stride)[1:-1, 1:-1]
+
+        self.stride = grid.stride
+        self.cell_size = cell_size
+        self.pixels = np.repeat(np.repeat(cells, cell_size, axis=0), cell_size, axis=1)
+        self.height, self.width = self.pixels.shape
+        self.blocks = self.pixels.reshape(grid.rows, cell_size, grid.cols, cell_size)  # A view, one block per cell
+
+    def everything(self):
+        return 0, self.height, 0, self.width
+
+    def paint(self, indices, codes):
+        y, x = np.divmod(indices, self.stride)
+        y -= 1
+        x -= 1
+        self.blocks[y, :, x, :] = codes[:, None, None]
+        size = self.cell_size
+        return y.min() * size, (y.max() + 1) * size, x.min() * size, (x.max() + 1) * size
+
+
+def frames(canvas, solver, explored, cells_per_frame):
+    """Paint the explored cells, then the path, ``cells_per_frame`` at a time.
+
+    Yields the changed box of every frame, starting with the bare maze; the
+    frame itself is always ``canvas.pixels``.
+    """
+    yield canvas.everything()
+
+    indices = np.frombuffer(explored.indices, dtype=np.int32).astype(np.intp)
+    codes = np.full(len(indices), EXPLORED, dtype=np.uint8)
+    if getattr(solver, "sides", None):
+        codes[np.frombuffer(solver.sides, dtype=np.uint8) == logic.BACKWARD] = BACKWARD
+    path = np.array([solver.grid.index(cell) for cell in solver.path], dtype=np.intp)
+
+    for indices, codes in ((indices, codes), (path, np.full(len(path), PATH, dtype=np.uint8))):
+        for i in range(0, len(indices), cells_per_frame):
+            yield canvas.paint(indices[i : i + cells_per_frame], codes[i : i + cells_per_frame])
+
+
+class RawWriter:
+    """Raw rgb24 frames back to back, to a file or stdout (``-``).
+
+    Play or encode them with e.g.
+    ``ffmpeg -f rawvideo -pix_fmt rgb24 -s WIDTHxHEIGHT -r FPS -i FILE out.mp4``.
+    """
+
+    def __init__(self, file_path, canvas, fps):
+        self.file = sys.stdout.buffer if file_path == "-" else open(file_path, "wb")
+        self.rgb = np.empty((canvas.height, canvas.width, 3), dtype=np.uint8)
+
+    def write(self, pixels, box):
+        top, bottom, left, right = box
+        self.rgb[top:bottom, left:right] = PALETTE[pixels[top:bottom, left:right]]
+        self.file.write(self.rgb)
+
+    def close(self):
+        if self.file is sys.stdout.buffer:
+            self.file.flush()
+        else:
+            self.file.close()
+
+
+class PngWriter:
+    """One PNG per frame, ``frame_00000.png`` onwards, in a directory.
+
+    Much slower than the other formats, as pygame compresses every PNG hard;
+    frames without changes are copies of the previous file.
+    """
+
+    def __init__(self, directory, canvas, fps):
+        import pygame
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.surface = pygame.Surface((canvas.width, canvas.height))
+        self.count = 0
+
+    def write(self, pixels, box):
+        import pygame
+
+        top, bottom, left, right = box
+        file_path = os.path.join(self.directory, f"frame_{self.count:05d}.png")
+        if top == bottom and self.count:
+            shutil.copyfile(os.path.join(self.directory, f"frame_{self.count - 1:05d}.png"), file_path)
+        else:
+            view = pygame.surfarray.pixels3d(self.surface)
+            view[left:right, top:bottom] = PALETTE[pixels[top:bottom, left:right]].transpose(1, 0, 2)
+            del view  # Unlock the surface
+            pygame.image.save(self.surface, file_path)
+        self.count += 1
+
+    def close(self):
+        pass
+
+
+class GifWriter:
+    """A looping GIF, written frame by frame; needs Pillow.
+
+    Each frame stores only its changed box, drawn over the previous frame, so
+    the file never holds more than one frame in memory. GIF delays are whole
+    hundredths of a second, so the frame rate is rounded to fit.
+    """
+
+    def __init__(self, file_path, canvas, fps):
+        from PIL import GifImagePlugin, Image
+
+        self.Image = Image
+        self.plugin = GifImagePlugin
+        self.file = open(file_path, "wb")
+        self.palette = PALETTE.tobytes()
+        self.duration = 10 * max(1, round(100 / fps))
+        self.started = False
+
+    def image(self, block):
+        image = self.Image.frombytes("P", (block.shape[1], block.shape[0]), block.tobytes())
+        image.putpalette(self.palette)
+        return image
+
+    def write(self, pixels, box):
+        top, bottom, left, right = box
+        if not self.started:
+            header, _ = self.plugin.getheader(self.image(pixels), info={"loop": 0, "optimize": False})
+            self.file.write(b"".join(header))
+            self.started = True
+        if top == bottom:
+            top, bottom, left, right = 0, 1, 0, 1  # GIF frames cannot be empty; repeat one pixel
+        image = self.image(pixels[top:bottom, left:right])
+        data = self.plugin.getdata(image, offset=(left, top), duration=self.duration, disposal=1)
+        self.file.write(b"".join(data))
+
+    def close(self):
+        self.file.write(b";")
+        self.file.close()
+
+
+WRITERS = {"raw": RawWriter, "png": PngWriter, "gif": GifWriter}
+
+
+def output_format(output):
+    if output == "-" or output.endswith((".raw", ".rgb")):
+        return "raw"
+    return "gif" if output.endswith(".gif") else "png"
+
+
+def export(solver, explored, output, writer_name=None, fps=30, cells_per_frame=None, seconds=5, cell_size=1, hold=1):
+    """Render the search of a finished ``solver`` to ``output`` without opening a window.
+
+    Without ``cells_per_frame`` the explored cells are spread over about
+    ``seconds`` of animation; the last frame is shown for another ``hold``
+    seconds. Returns the number of frames written and their size.
+    """
+    if cells_per_frame is None:
+        cells_per_frame = max(1, -(-len(explored) // max(1, round(seconds * fps))))
+    canvas = Canvas(solver.grid, cell_size)
+    writer = WRITERS[writer_name or output_format(output)](output, canvas, fps)
+    count = 0
+    try:
+        for box in frames(canvas, solver, explored, cells_per_frame):
+            writer.write(canvas.pixels, box)
+            count += 1
+        for _ in range(round(hold * fps)):
+            writer.write(canvas.pixels, (0, 0, 0, 0))
+            count += 1
+    finally:
+        writer.close()
+    return count, (canvas.width, canvas.height)
+
+
+def positive_float(text):
+    value = float(text)
+    if not 0 < value < float("inf"):
+        raise argparse.ArgumentTypeError(f"must be a finite number above 0, got {text}")
+    return value
+
+
+def non_negative_float(text):
+    value = float(text)
+    if not 0 <= value < float("inf"):
+        raise argparse.ArgumentTypeError(f"must be a finite number of at least 0, got {text}")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a solver's search as an animation, without a display.")
+    parser.add_argument("maze", help="maze .txt or binary .maze file")
+    parser.add_argument("output", help="a .gif file, a .raw/.rgb file or - for raw rgb24 frames, or a directory for PNGs")
+    parser.add_argument("--solver", default="DeadEndFilling", choices=SOLVERS)
+    parser.add_argument("--format", choices=WRITERS, help="output format (default: from the output name)")
+    parser.add_argument("--fps", type=positive_float, default=30)
+    parser.add_argument("--cells-per-frame", type=positive_int, help="cells painted per frame (default: fit --seconds)")
+    parser.add_argument("--seconds", type=positive_float, default=5, help="length of the explore phase without --cells-per-frame")
+    parser.add_argument("--cell-size", type=positive_int, default=1, help="pixels per cell")
+    parser.add_argument("--hold", type=non_negative_float, default=1, help="seconds to keep showing the final frame")
+    args = parser.parse_args(argv)
+
+    began = time.perf_counter()
+    solver, explored, _ = solve(args.maze, args.solver)
+    count, (width, height) = export(
+        solver,
+        explored,
+        args.output,
+        args.format,
+        args.fps,
+        args.cells_per_frame,
+        args.seconds,
+        args.cell_size,
+        args.hold,
+    )
+    cprint(
+        f"Wrote {count} frames of {width}x{height} to {args.output} in {time.perf_counter() - began:.2f}s",
+        "green",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,160 +1,366 @@
-from collections import deque
-
-
-def is_solvable(maze, start, end, height, width):
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    queue = deque([start])
-    visited = set()
-    visited.add(start)
-
-    while queue:
-        current = queue.popleft()
-        if current == end:
-            return True
-        for d in directions:
-            ni, nj = current[0] + d[0], current[1] + d[1]
-            if (
-                0 <= ni < height
-                and 0 <= nj < width
-                and maze[ni][nj] in ["c", "e"]
-                and (ni, nj) not in visited
-            ):
-                visited.add((ni, nj))
-                queue.append((ni, nj))
-
-    return False
-
-
-# Updated maze generation to ensure connectivity
+import argparse
 import random
+from array import array
 from colorama import init, Fore
+from logic import Grid
 
 # Initialize colorama
 init()
 
+WALL = ord("#")
+CELL = ord(".")
+UNVISITED = ord("u")
+
+
+def is_solvable(maze, start=None, end=None):
+    """Whether ``end`` can be reached from ``start`` (``(x, y)`` cells, default ``S`` and ``E``)."""
+    grid = maze if isinstance(maze, Grid) else Grid(maze)
+    start = start or grid.find("S")
+    end = end or grid.find("E")
+    return start is not None and end is not None and grid.connected(start, end)
+
 
 def printMaze(maze):
+    colors = {"#": Fore.RED, ".": Fore.WHITE, "S": Fore.BLUE, "E": Fore.MAGENTA}
     for row in maze:
         for cell in row:
-            if cell == "u":
-                print(Fore.WHITE + ".", end="")
-            elif cell == "c":
-                print(Fore.GREEN + ".", end="")
-            elif cell == "w":
-                print(Fore.RED + "#", end="")
-            elif cell == "s":
-                print(Fore.BLUE + "S", end="")
-            elif cell == "e":
-                print(Fore.MAGENTA + "E", end="")
+            print(colors.get(cell, Fore.WHITE) + cell, end="")
         print()
 
 
-def surroundingCells(rand_wall, maze, height, width):
-    s_cells = 0
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for d in directions:
-        ni, nj = rand_wall[0] + d[0], rand_wall[1] + d[1]
-        if 0 <= ni < height and 0 <= nj < width and maze[ni][nj] == "c":
-            s_cells += 1
-    return s_cells
+def generate(height=25, width=25, seed=None):
+    """Generate a maze with randomized Prim's algorithm.
 
+    Returns the maze as a list of strings: ``#`` walls, ``.`` passages, ``S`` on
+    the top row and ``E`` on the bottom row. The same seed gives the same maze.
+    """
+    assert height % 2 == 1 and width % 2 == 1, "Height and width must be odd numbers"
+    rng = random.Random(seed)
+    rand = rng.random
 
-# Init variables
-wall = "w"
-cell = "c"
-unvisited = "u"
-height = 25
-width = 25
+    # Initialize the maze with outer walls; every unvisited cell is interior,
+    # so its neighbours never need a bounds check
+    maze = bytearray([UNVISITED]) * (height * width)
+    maze[:width] = maze[-width:] = bytes([WALL]) * width
+    maze[::width] = maze[width - 1 :: width] = bytes([WALL]) * height
+    offsets = (-width, width, -1, 1)
 
-assert height % 2 == 1 and width % 2 == 1, "Height and width must be odd numbers"
+    # Randomize starting point and set it a cell
+    start = rng.randint(1, height - 2) * width + rng.randint(1, width - 2)
+    maze[start] = CELL
 
-maze = []
+    # Frontier walls live in a list for O(1) random picks with swap-and-pop
+    # removal, and in a bitmap for O(1) membership tests
+    in_walls = bytearray(height * width)
+    walls = []
+    for offset in offsets:
+        if maze[start + offset] == UNVISITED:
+            in_walls[start + offset] = 1
+            walls.append(start + offset)
 
-entrance = "s"
-exit = "e"
+    while walls:
+        k = int(rand() * len(walls))
+        rand_wall = walls[k]
+        walls[k] = walls[-1]
+        walls.pop()
+        in_walls[rand_wall] = 0
 
-# Initialize the maze with outer walls
-maze = [
-    [
-        wall if i == 0 or i == height - 1 or j == 0 or j == width - 1 else unvisited
-        for j in range(width)
-    ]
-    for i in range(height)
-]
-
-# Randomize starting point and set it a cell
-starting_height, starting_width = random.randint(1, height - 2), random.randint(
-    1, width - 2
-)
-maze[starting_height][starting_width] = cell
-walls = [
-    [starting_height + di, starting_width + dj]
-    for di, dj in [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    if maze[starting_height + di][starting_width + dj] == unvisited
-]
-
-while walls:
-    rand_wall = random.choice(walls)
-    walls.remove(rand_wall)
-
-    r, c = rand_wall
-    if maze[r][c] == wall:
-        continue
-
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    adjacent_cells = [
-        maze[r + d[0]][c + d[1]]
-        for d in directions
-        if 0 <= r + d[0] < height and 0 <= c + d[1] < width
+        if (
+            (maze[rand_wall - width] == CELL)
+            + (maze[rand_wall + width] == CELL)
+            + (maze[rand_wall - 1] == CELL)
+            + (maze[rand_wall + 1] == CELL)
+        ) < 2:
+            maze[rand_wall] = CELL
+            for offset in offsets:
+                nw = rand_wall + offset
+                if maze[nw] == UNVISITED and not in_walls[nw]:
+                    in_walls[nw] = 1
+                    walls.append(nw)
+
+    # Mark the remaining unvisited cells as walls
+    maze = maze.replace(bytes([UNVISITED]), bytes([WALL]))
+    return finish(maze, height, width)
+
+
+def finish(maze, height, width):
+    """Place the entrance and exit on a flat ``#``/``.`` bytearray and split it into rows."""
+    top = maze.find(CELL, width + 1, 2 * width - 1)
+    if top >= 0:
+        maze[top - width] = ord("S")
+
+    bottom = maze.rfind(CELL, (height - 2) * width + 1, (height - 1) * width - 1)
+    if bottom >= 0:
+        maze[bottom + width] = ord("E")
+
+    return [maze[i : i + width].decode() for i in range(0, height * width, width)]
+
+
+def _cell_grid(height, width):
+    """All-wall maze plus the shape of its cell grid (cells sit on odd rows and columns)."""
+    assert height % 2 == 1 and width % 2 == 1, "Height and width must be odd numbers"
+    return bytearray([WALL]) * (height * width), (height - 1) // 2, (width - 1) // 2
+
+
+def _carve(maze, a, b, cell_cols, width):
+    """Open cells ``a`` and ``b`` (cell grid ids) and the wall between them."""
+    i, j = divmod(a, cell_cols)
+    ia = (2 * i + 1) * width + 2 * j + 1
+    i, j = divmod(b, cell_cols)
+    ib = (2 * i + 1) * width + 2 * j + 1
+    maze[ia] = maze[ib] = maze[(ia + ib) // 2] = CELL
+
+
+def _cell_neighbors(cell, cell_rows, cell_cols):
+    i, j = divmod(cell, cell_cols)
+    neighbors = []
+    if i > 0:
+        neighbors.append(cell - cell_cols)
+    if i < cell_rows - 1:
+        neighbors.append(cell + cell_cols)
+    if j > 0:
+        neighbors.append(cell - 1)
+    if j < cell_cols - 1:
+        neighbors.append(cell + 1)
+    return neighbors
+
+
+def backtracker(height=25, width=25, seed=None):
+    """Recursive backtracker (randomized depth-first search) with an explicit stack."""
+    rng = random.Random(seed)
+    rand = rng.random
+    maze, cell_rows, cell_cols = _cell_grid(height, width)
+    visited = bytearray(cell_rows * cell_cols)
+
+    current = rng.randrange(cell_rows * cell_cols)
+    visited[current] = 1
+    _carve(maze, current, current, cell_cols, width)
+    stack = [current]
+    while stack:
+        current = stack[-1]
+        options = [n for n in _cell_neighbors(current, cell_rows, cell_cols) if not visited[n]]
+        if not options:
+            stack.pop()
+            continue
+        chosen = options[int(rand() * len(options))]
+        visited[chosen] = 1
+        _carve(maze, current, chosen, cell_cols, width)
+        stack.append(chosen)
+
+    return finish(maze, height, width)
+
+
+def kruskal(height=25, width=25, seed=None):
+    """Randomized Kruskal's algorithm over a union-find stored in a flat array."""
+    rng = random.Random(seed)
+    maze, cell_rows, cell_cols = _cell_grid(height, width)
+    count = cell_rows * cell_cols
+
+    edges = [(cell, cell + 1) for cell in range(count) if cell % cell_cols != cell_cols - 1]
+    edges += [(cell, cell + cell_cols) for cell in range(count - cell_cols)]
+    rng.shuffle(edges)
+
+    parent = array("i", range(count))
+
+    def root(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]  # Path halving
+            cell = parent[cell]
+        return cell
+
+    for cell in range(count):
+        _carve(maze, cell, cell, cell_cols, width)
+    for a, b in edges:
+        root_a, root_b = root(a), root(b)
+        if root_a != root_b:
+            parent[root_a] = root_b
+            _carve(maze, a, b, cell_cols, width)
+
+    return finish(maze, height, width)
+
+
+def wilson(height=25, width=25, seed=None):
+    """Wilson's algorithm: loop-erased random walks, giving a uniform spanning tree."""
+    rng = random.Random(seed)
+    rand = rng.random
+    maze, cell_rows, cell_cols = _cell_grid(height, width)
+    count = cell_rows * cell_cols
+    in_tree = bytearray(count)
+    walk_next = array("i", [0]) * count  # Last exit taken from each cell; erases loops
+
+    in_tree[rng.randrange(count)] = 1
+    order = list(range(count))
+    rng.shuffle(order)
+    for start in order:
+        current = start
+        while not in_tree[current]:
+            options = _cell_neighbors(current, cell_rows, cell_cols)
+            walk_next[current] = options[int(rand() * len(options))]
+            current = walk_next[current]
+
+        current = start
+        while not in_tree[current]:
+            in_tree[current] = 1
+            _carve(maze, current, walk_next[current], cell_cols, width)
+            current = walk_next[current]
+
+    if count == 1:
+        _carve(maze, 0, 0, cell_cols, width)
+    return finish(maze, height, width)
+
+
+def _eller_body(height, width, rng):
+    """Rows 1 to height - 2 of an Eller's algorithm maze, one string at a time."""
+    rand = rng.random
+    cell_rows, cell_cols = (height - 1) // 2, (width - 1) // 2
+    sets = list(range(cell_cols))
+    members = {label: [j] for j, label in enumerate(sets)}
+    next_label = cell_cols
+
+    for i in range(cell_rows):
+        last = i == cell_rows - 1
+
+        # Randomly join horizontally adjacent cells from different sets; the
+        # last row joins them all so the maze ends up connected
+        row = bytearray([WALL]) * width
+        for j in range(cell_cols):
+            row[2 * j + 1] = CELL
+            if j < cell_cols - 1 and sets[j] != sets[j + 1] and (last or rand() < 0.5):
+                row[2 * j + 2] = CELL
+                keep, drop = sets[j], sets[j + 1]
+                if len(members[keep]) < len(members[drop]):
+                    keep, drop = drop, keep
+                for k in members[drop]:
+                    sets[k] = keep
+                members[keep] += members.pop(drop)
+        yield row.decode()
+
+        if last:
+            return
+
+        # Every set carries on downwards through at least one cell; the
+        # cells below that are not joined start sets of their own
+        below = bytearray([WALL]) * width
+        carried = {}
+        for label, columns in members.items():
+            rng.shuffle(columns)
+            carried[label] = [columns[0]] + [j for j in columns[1:] if rand() < 0.5]
+            for j in carried[label]:
+                below[2 * j + 1] = CELL
+        yield below.decode()
+
+        members = carried
+        for j in range(cell_cols):
+            if below[2 * j + 1] != CELL:
+                sets[j] = next_label
+                members[next_label] = [j]
+                next_label += 1
+
+
+def eller_rows(height=25, width=25, seed=None):
+    """Eller's algorithm, yielding the finished maze one row string at a time.
+
+    Only the current row's sets are kept, so memory is O(width) however tall
+    the maze is.
+    """
+    assert height % 2 == 1 and width % 2 == 1, "Height and width must be odd numbers"
+    body = _eller_body(height, width, random.Random(seed))
+
+    previous = next(body)
+    top = bytearray([WALL]) * width
+    top[previous.index(".")] = ord("S")
+    yield top.decode()
+
+    for row in body:
+        yield previous
+        previous = row
+    yield previous
+
+    bottom = bytearray([WALL]) * width
+    bottom[previous.rindex(".")] = ord("E")
+    yield bottom.decode()
+
+
+def eller(height=25, width=25, seed=None):
+    return list(eller_rows(height, width, seed))
+
+
+GENERATORS = {
+    "prim": generate,
+    "backtracker": backtracker,
+    "kruskal": kruskal,
+    "wilson": wilson,
+    "eller": eller,
+}
+
+
+def carve_rooms(maze, count, max_size=9, seed=None):
+    """Open ``count`` random rectangular rooms inside a generated maze.
+
+    The outer walls, ``S`` and ``E`` are left alone; mazes with no room for a
+    2x2 room inside them are returned unchanged. Returns new row strings.
+    """
+    rng = random.Random(seed)
+    height, width = len(maze), len(maze[0])
+    if height - 2 < 2 or width - 2 < 2:
+        return list(maze)
+    rows = [bytearray(row.encode()) for row in maze]
+    for _ in range(count):
+        room_height = rng.randint(2, min(max_size, height - 2))
+        room_width = rng.randint(2, min(max_size, width - 2))
+        top = rng.randint(1, height - 1 - room_height)
+        left = rng.randint(1, width - 1 - room_width)
+        for row in rows[top : top + room_height]:
+            row[left : left + room_width] = bytes([CELL]) * room_width
+    return [row.decode() for row in rows]
+
+
+def add_terrain(maze, max_cost=9, density=0.3, seed=None):
+    """Turn about ``density`` of the ``.`` cells into terrain digits costing 2 to ``max_cost``.
+
+    Returns new row strings, unchanged when ``max_cost`` is below 2.
+    """
+    if max_cost < 2:
+        return list(maze)
+    rng = random.Random(seed)
+    digits = "23456789"[: max_cost - 1]
+    return [
+        "".join(rng.choice(digits) if cell == "." and rng.random() < density else cell for cell in row)
+        for row in maze
     ]
 
-    if adjacent_cells.count(cell) < 2:
-        maze[r][c] = cell
-        new_walls = [
-            (r + d[0], c + d[1])
-            for d in directions
-            if 0 <= r + d[0] < height
-            and 0 <= c + d[1] < width
-            and maze[r + d[0]][c + d[1]] == unvisited
-        ]
-
-        for nw in new_walls:
-            if nw not in walls:
-                walls.append(nw)
-
-        maze[r][c] = cell
-
-# Mark the remaining unvisited cells as walls
-for i in range(height):
-    for j in range(width):
-        if maze[i][j] == unvisited:
-            maze[i][j] = wall
-
-# Set entrance and exit
-for i in range(1, width - 1):
-    if maze[1][i] == "c":
-        maze[0][i] = entrance
-        start = (0, i)
-        break
-
-for i in range(width - 2, 0, -1):
-    if maze[height - 2][i] == "c":
-        maze[height - 1][i] = exit
-        end = (height - 1, i)
-        break
-
-# Print final maze
-with open("maze.txt", "w") as file:
-    for row in maze:
-        for cell in row:
-            if cell == "u":
-                file.write(".")
-            elif cell == "c":
-                file.write(".")
-            elif cell == "w":
-                file.write("#")
-            elif cell == "s":
-                file.write("S")
-            elif cell == "e":
-                file.write("E")
-        file.write("\n")
+
+def write_maze(maze, file_path="maze.txt"):
+    with open(file_path, "w") as file:
+        file.write("\n".join(maze) + "\n")
+
+
+def write_rows(rows, file_path="maze.txt"):
+    """Write rows from a generator such as ``eller_rows`` without holding the maze."""
+    with open(file_path, "w") as file:
+        for row in rows:
+            file.write(row + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a maze file.")
+    parser.add_argument("height", type=int, nargs="?", default=25)
+    parser.add_argument("width", type=int, nargs="?", default=25)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--out", default="maze.txt")
+    parser.add_argument("--algorithm", default="prim", choices=GENERATORS)
+    parser.add_argument("--rooms", type=int, default=0, help="open this many random rooms afterwards")
+    parser.add_argument(
+        "--terrain", type=int, default=0, choices=[0, *range(2, 10)], metavar="MAX_COST", help="scatter terrain costs 2..MAX_COST"
+    )
+    args = parser.parse_args()
+
+    if args.algorithm == "eller" and not args.rooms and not args.terrain:
+        write_rows(eller_rows(args.height, args.width, args.seed), args.out)
+    else:
+        maze = GENERATORS[args.algorithm](args.height, args.width, args.seed)
+        if args.rooms:
+            maze = carve_rooms(maze, args.rooms, seed=args.seed)
+        if args.terrain:
+            maze = add_terrain(maze, args.terrain, seed=args.seed)
+        write_maze(maze, args.out)
@@ -0,0 +1,226 @@
+"""Array-based versions of the solver inner loops, compiled with Numba when it is installed.
+
+The solvers in ``logic.py`` call these from ``search()`` on grids of at least
+``MIN_CELLS`` cells while ``enabled`` is true, which is the default whenever
+Numba is installed (set ``MAZE_KERNELS=0`` to opt out). Numba is only
+imported, and the kernels only compiled, on the first kernel call, so
+importing this module stays cheap.
+Without Numba the functions still run, as plain and much slower Python, which
+is what the parity tests rely on to compare them with the solvers' own loops
+anywhere.
+
+Every kernel pushes the same keys as the pure-Python loop it replaces, and
+those keys are unique, so cells are expanded in exactly the same order.
+"""
+
+import os
+import warnings
+from importlib.util import find_spec
+import numpy as np
+
+AVAILABLE = find_spec("numba") is not None  # Finds the package without importing it
+enabled = AVAILABLE and os.environ.get("MAZE_KERNELS", "1") != "0"
+MIN_CELLS = 500_000  # Smaller grids are solved faster than Numba loads its cached kernels
+_compiled = False
+
+
+def _compile():
+    """Swap every kernel and helper below for its ``numba.njit`` version, once.
+
+    If Numba is installed but cannot be imported (e.g. it was built against
+    another NumPy), ``enabled`` is turned off and the solvers keep their own
+    loops.
+    """
+    global _compiled, enabled
+    if AVAILABLE and not _compiled:
+        try:
+            import numba
+        except Exception as error:
+            warnings.warn(f"Numba could not be imported ({error}); using the pure-Python solver loops")
+            enabled = False
+            return False
+
+        for name in ("_grow", "_less", "_swap", "_sift_up", "_sift_down", "_best_first", "_dead_ends"):
+            globals()[name] = numba.njit(cache=True)(globals()[name])
+        _compiled = True
+        _warm_up()
+    _compiled = True
+    return True
+
+
+def _warm_up():
+    """Load the machine code on a one-cell grid, with the argument types the solvers pass."""
+    cells = np.zeros(9, dtype=np.uint8)
+    cells[4] = 1
+    labels = np.full(9, -1, dtype=np.int32)
+    _best_first(cells, 3, 4, 4, 0, labels, labels.copy(), np.empty(9, dtype=np.int32))
+    _dead_ends(cells, np.zeros(9, dtype=np.uint8), cells == 1, 3, np.empty(0, dtype=np.intp), np.empty(9, dtype=np.int32))
+
+
+def usable():
+    """Whether the solvers should call the kernels; imports and loads them on the first call."""
+    return enabled and _compile()
+
+
+def _grow(heap):
+    bigger = np.empty((2 * heap.shape[0], heap.shape[1]), dtype=heap.dtype)
+    bigger[: heap.shape[0]] = heap
+    return bigger
+
+
+def _less(heap, i, j):
+    """Row ``i`` before row ``j``, comparing the columns like tuples."""
+    for column in range(heap.shape[1]):
+        if heap[i, column] != heap[j, column]:
+            return heap[i, column] < heap[j, column]
+    return False
+
+
+def _swap(heap, i, j):
+    for column in range(heap.shape[1]):
+        heap[i, column], heap[j, column] = heap[j, column], heap[i, column]
+
+
+def _sift_up(heap, i):
+    while i:
+        parent = (i - 1) >> 1
+        if not _less(heap, i, parent):
+            break
+        _swap(heap, i, parent)
+        i = parent
+
+
+def _sift_down(heap, size, i):
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            break
+        if child + 1 < size and _less(heap, child + 1, child):
+            child += 1
+        if not _less(heap, child, i):
+            break
+        _swap(heap, i, child)
+        i = child
+
+
+def best_first(costs, stride, start, end, scale, g_score, came_from, order):
+    """A* with the Manhattan heuristic times ``scale``; Dijkstra when ``scale`` is 0.
+
+    ``costs`` is the grid's cost per cell (0 for walls). ``g_score`` and
+    ``came_from`` must hold -1 and are filled in; ``order`` receives the
+    expanded cells. Returns ``(expanded, pops, stale, remaining, found)``.
+    """
+    _compile()
+    return _best_first(costs, stride, start, end, scale, g_score, came_from, order)
+
+
+def _best_first(costs, stride, start, end, scale, g_score, came_from, order):
+    offsets = np.array([-1, 1, -stride, stride])
+    end_y, end_x = end // stride, end % stride
+    closed = np.zeros(costs.shape[0], dtype=np.uint8)
+
+    heap = np.empty((1024, 3), dtype=np.int64)  # Rows of (f, -g, cell)
+    heap[0, 0] = scale * (abs(start % stride - end_x) + abs(start // stride - end_y))
+    heap[0, 1] = 0
+    heap[0, 2] = start
+    size = 1
+    g_score[start] = 0
+    expanded = pops = stale = 0
+    found = False
+
+    while size:
+        neg_g, current = heap[0, 1], heap[0, 2]
+        size -= 1
+        heap[0] = heap[size]
+        _sift_down(heap, size, 0)
+        pops += 1
+        if closed[current]:
+            stale += 1
+            continue
+        if current == end:
+            found = True
+            break
+
+        closed[current] = 1
+        order[expanded] = current
+        expanded += 1
+
+        for k in range(4):
+            neighbor = current + offsets[k]
+            cost = costs[neighbor]
+            if cost == 0 or closed[neighbor]:
+                continue
+            tentative_g_score = cost - neg_g
+            if g_score[neighbor] < 0 or tentative_g_score < g_score[neighbor]:
+                came_from[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                if size == heap.shape[0]:
+                    heap = _grow(heap)
+                y, x = neighbor // stride, neighbor % stride
+                heap[size, 0] = tentative_g_score + scale * (abs(x - end_x) + abs(y - end_y))
+                heap[size, 1] = -tentative_g_score
+                heap[size, 2] = neighbor
+                _sift_up(heap, size)
+                size += 1
+
+    return expanded, pops, stale, size, found
+
+
+def dead_ends(is_open, degree, fillable, stride, first_pass, order):
+    """``DeadEndFilling.mark_dead_ends`` over arrays.
+
+    ``is_open`` and ``degree`` are updated in place, ``first_pass`` holds the
+    initial dead ends in ascending order, and ``order`` receives the filled
+    cells. Returns ``(filled, passes, stale)``.
+    """
+    _compile()
+    return _dead_ends(is_open, degree, fillable, stride, first_pass, order)
+
+
+def _dead_ends(is_open, degree, fillable, stride, first_pass, order):
+    offsets = np.array([-1, 1, -stride, stride])
+    heap = np.empty((max(first_pass.shape[0], 16), 1), dtype=np.int64)
+    heap[: first_pass.shape[0], 0] = first_pass  # Sorted, so already a heap
+    size = first_pass.shape[0]
+    next_pass = np.empty((16, 1), dtype=np.int64)
+    waiting = 0
+    filled = passes = stale = 0
+
+    while size:
+        passes += 1
+        while size:
+            i = heap[0, 0]
+            size -= 1
+            heap[0, 0] = heap[size, 0]
+            _sift_down(heap, size, 0)
+            if degree[i] != 1:
+                stale += 1
+                continue
+
+            is_open[i] = 0
+            order[filled] = i
+            filled += 1
+            for k in range(4):
+                neighbor = i + offsets[k]
+                if is_open[neighbor]:
+                    degree[neighbor] -= 1
+                    if degree[neighbor] == 1 and fillable[neighbor]:
+                        if neighbor > i:
+                            if size == heap.shape[0]:
+                                heap = _grow(heap)
+                            heap[size, 0] = neighbor
+                            _sift_up(heap, size)
+                            size += 1
+                        else:
+                            if waiting == next_pass.shape[0]:
+                                next_pass = _grow(next_pass)
+                            next_pass[waiting, 0] = neighbor
+                            waiting += 1
+
+        size = waiting
+        if size > heap.shape[0]:
+            heap = np.empty((size, 1), dtype=np.int64)
+        heap[:size, 0] = np.sort(next_pass[:waiting, 0])
+        waiting = 0
+
+    return filled, passes, stale
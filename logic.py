@@ -1,258 +1,1023 @@
 import heapq
-from termcolor import cprint
+from array import array
+from collections import deque
+from time import perf_counter
+import numpy as np
+import kernels
 
-class aStar:
-    def __init__(self, maze, start, end):
-        self.maze = maze
-        self.start = start
-        self.end = end
-        self.rows = len(maze)
-        self.cols = len(maze[0])
-        self.open_set = []
-        self.came_from = {}
-        self.g_score = {}
-        self.f_score = {}
-        self.explored = []
+WALL = ord("#")
+OPEN = ord(".")
 
-    def heuristic(self, a, b):
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+# Byte translation table: 1 for every cell a solver may step on, 0 for walls
+_WALKABLE = bytes(0 if c == WALL else 1 for c in range(256))
+
+# Cost of stepping onto a cell: the digits 1-9 are terrain costs, every other
+# walkable cell costs 1 and walls 0
+_COSTS = bytes(0 if c == WALL else c - ord("0") if ord("1") <= c <= ord("9") else 1 for c in range(256))
 
-    def search(self):
-        self.open_set.append(self.start)
-        self.came_from[self.start] = None
-        self.g_score[self.start] = 0
-        self.f_score[self.start] = self.heuristic(self.start, self.end)
-
-        while self.open_set:
-            current = min(
-                self.open_set, key=lambda o: self.f_score.get(o, float("inf"))
-            )
-            if current == self.end:
-                return self.reconstruct_path(current), self.explored
-
-            self.open_set.remove(current)
-            self.explored.append(current)
-
-            for neighbor in self.get_neighbors(current):
-                tentative_g_score = self.g_score.get(current, float("inf")) + 1
-
-                if (
-                    neighbor not in self.g_score
-                    or tentative_g_score < self.g_score[neighbor]
-                ):
-                    self.came_from[neighbor] = current
-                    self.g_score[neighbor] = tentative_g_score
-                    self.f_score[neighbor] = self.g_score[neighbor] + self.heuristic(
-                        neighbor, self.end
-                    )
 
-                    if neighbor not in self.open_set:
-                        self.open_set.append(neighbor)
+class Grid:
+    """Flat, wall-padded byte representation of a maze.
 
-        return [], self.explored
+    Built from a list of row strings (or lists of characters) or from a
+    ``(rows, cols)`` array of cell characters. Cells are addressed by a single
+    linear index. The maze is surrounded by a
+    one cell thick wall border, so the four neighbours of any cell are always
+    ``i - 1``, ``i + 1``, ``i - stride`` and ``i + stride`` and no bounds checks
+    are needed.
 
-    def get_neighbors(self, node):
+    Digit cells ``1``-``9`` are terrain: stepping onto one costs its value.
+    ``weighted`` is False for plain mazes, where every step costs 1.
+    """
+
+    def __init__(self, maze):
+        self.rows = len(maze)
+        self.cols = len(maze[0])
+        self.stride = self.cols + 2
+
+        if isinstance(maze, np.ndarray):
+            # A (rows, cols) array of cell characters, e.g. from a maze file
+            padded = np.full((self.rows + 2, self.stride), WALL, dtype=np.uint8)
+            padded[1:-1, 1:-1] = maze
+            cells = bytearray(padded.tobytes())
+        else:
+            border = b"#" * self.stride
+            cells = bytearray(border)
+            for y, row in enumerate(maze):
+                if len(row) != self.cols:
+                    raise ValueError(f"row {y} has {len(row)} cells, expected {self.cols}")
+                cells += b"#" + "".join(row).encode() + b"#"
+            cells += border
+
+        self.cells = cells
+        self.size = len(cells)
+        self.walkable = bytearray(cells.translate(_WALKABLE))
+        self.costs = bytearray(cells.translate(_COSTS))
+        self.max_cost = max(self.costs)
+        self.weighted = self.max_cost > 1
+        self.min_cost = min(c for c in range(1, 10) if c in self.costs) if self.weighted else 1
+        self.offsets = (-1, 1, -self.stride, self.stride)  # Left, Right, Up, Down
+        self.jumps = None  # JPS+ tables, built on first use by JumpPointSearch
+        self.labels = None  # Component ids, built by label()
+        self.sizes = None
+
+    def index(self, node):
         x, y = node
-        neighbors = []
-        if x > 0 and self.maze[y][x - 1] != "#":  # Left
-            neighbors.append((x - 1, y))
-        if x < self.cols - 1 and self.maze[y][x + 1] != "#":  # Right
-            neighbors.append((x + 1, y))
-        if y > 0 and self.maze[y - 1][x] != "#":  # Up
-            neighbors.append((x, y - 1))
-        if y < self.rows - 1 and self.maze[y + 1][x] != "#":  # Down
-            neighbors.append((x, y + 1))
-        return neighbors
-
-    def reconstruct_path(self, current):
-        path = []
-        while current in self.came_from:
-            path.append(current)
-            current = self.came_from[current]
-        path.reverse()
-        return path
+        return (y + 1) * self.stride + x + 1
+
+    def coords(self, index):
+        y, x = divmod(index, self.stride)
+        return x - 1, y - 1
+
+    def find(self, cell):
+        index = self.cells.find(cell.encode())
+        return None if index < 0 else self.coords(index)
+
+    def neighbors(self, index):
+        walkable = self.walkable
+        return [index + offset for offset in self.offsets if walkable[index + offset]]
+
+    def label(self):
+        """Component id of every cell (-1 for walls) and the size of every component.
+
+        Computed on first use and kept, after which ``connected`` is O(1) and
+        the solvers skip searches that cannot succeed.
+        """
+        if self.labels is None:
+            self.labels, self.sizes = components(self)
+        return self.labels, self.sizes
+
+    def connected(self, a, b):
+        labels, _ = self.label()
+        component = labels[self.index(a)]
+        return component >= 0 and component == labels[self.index(b)]
+
+    def component_size(self, node):
+        """Number of cells reachable from ``node``, itself included (0 for a wall)."""
+        labels, sizes = self.label()
+        component = labels[self.index(node)]
+        return int(sizes[component]) if component >= 0 else 0
+
+
+class Cells:
+    """List-like sequence of ``(x, y)`` cells stored as grid indices."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.indices = array("i")
+
+    def append(self, index):
+        self.indices.append(index)
+
+    def extend(self, indices):
+        self.indices.extend(indices)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        coords = self.grid.coords
+        for index in self.indices:
+            yield coords(index)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            coords = self.grid.coords
+            return [coords(index) for index in self.indices[key]]
+        return self.grid.coords(self.indices[key])
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def frontier_layers(grid, distance, sources, target=-1):
+    """Grow a breadth-first search from ``sources`` one frontier at a time.
+
+    ``distance`` is filled in place (unreached cells must hold -1) and every
+    frontier is yielded as an index array before it is expanded. The search
+    stops once ``target`` has a distance.
+    """
+    walkable = np.frombuffer(grid.walkable, dtype=np.uint8).view(bool)
+    offsets = np.array(grid.offsets)
+    frontier = np.unique(np.asarray(sources, dtype=np.int64))
+    distance[frontier] = 0
+    step = 0
+    while frontier.size and distance[target] < 0:
+        yield frontier
+        step += 1
+        candidates = (frontier[:, None] + offsets).ravel()
+        candidates = candidates[walkable[candidates]]
+        frontier = np.unique(candidates[distance[candidates] < 0])
+        distance[frontier] = step
+
+
+def components(grid):
+    """Connected components of the walkable cells, as ``(labels, sizes)``.
+
+    A vectorized union-find: every round hooks the root on the larger side of
+    each edge between two trees under the smaller root, then compresses all
+    paths by pointer jumping, and drops the edges now inside one tree.
+    ``labels`` numbers the components from 0 in scan order of their first cell.
+    """
+    walkable = np.frombuffer(grid.walkable, dtype=np.uint8).view(bool)
+    cells = np.flatnonzero(walkable)
+    right = cells[walkable[cells + 1]]
+    down = cells[walkable[cells + grid.stride]]
+    a = np.concatenate([right, down])
+    b = np.concatenate([right + 1, down + grid.stride])
+
+    parent = np.arange(grid.size)
+    while a.size:
+        root_a, root_b = parent[a], parent[b]
+        apart = root_a != root_b
+        a, b, root_a, root_b = a[apart], b[apart], root_a[apart], root_b[apart]
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    _, ids, sizes = np.unique(parent[cells], return_inverse=True, return_counts=True)
+    labels = np.full(grid.size, -1, dtype=np.int32)
+    labels[cells] = ids
+    return labels, sizes
+
+
+def distance_field(grid, sources, target=-1):
+    """Breadth-first distances from ``sources``; unreached cells hold -1."""
+    distance = np.full(grid.size, -1, dtype=np.int32)
+    for _ in frontier_layers(grid, distance, sources, target):
+        pass
+    return distance
+
+
+def descend(grid, distance, current):
+    """Follow ``distance`` downhill from ``current`` to a source, as grid indices."""
+    offsets = grid.offsets
+    path = [current]
+    d = distance[current]
+    while d > 0:
+        d -= 1
+        for offset in offsets:
+            if distance[current + offset] == d:
+                current += offset
+                break
+        path.append(current)
+    return path
+
+
+class Solver:
+    """Base class of the solvers: subclasses implement ``expand()``.
+
+    Every search leaves ``counters`` (queue pushes, pops, stale pops, ...;
+    which ones depends on the solver) and ``phases`` (seconds per named phase)
+    behind. They are derived from the search's own bookkeeping, so keeping
+    them costs next to nothing. When ``sink`` is set, on the class or on one
+    solver, it gets them as a record after every completed search.
+
+    Once the grid's component index exists (``Grid.label``), searches between
+    disconnected cells return no path at once instead of exhausting the grid.
+    """
 
+    unit_cost = False  # Set by solvers that assume every step costs 1
+    has_kernel = False  # Set by solvers whose expand() can run a loop from kernels.py
+    sink = None  # Anything with a record(dict) method, e.g. stats.Stats or stats.JsonlSink
 
-class RightHandRule:
     def __init__(self, maze, start, end):
-        self.maze = maze
+        self.grid = maze if isinstance(maze, Grid) else Grid(maze)
+        if self.unit_cost and self.grid.weighted:
+            raise ValueError(f"{type(self).__name__} does not support weighted mazes")
         self.start = start
         self.end = end
-        self.rows = len(maze)
-        self.cols = len(maze[0])
-        self.explored = []
+        self.rows = self.grid.rows
+        self.cols = self.grid.cols
+        self.explored = Cells(self.grid)
         self.path = []
-        self.directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # Right, Down, Left, Up
-        self.current_direction_index = 0
+        self.counters = {}
+        self.phases = {}
+        self._phase = None
+        # Checked here, so the first call's Numba import is not part of a timed search()
+        self.kernels_ready = self.has_kernel and self.grid.size >= kernels.MIN_CELLS and kernels.usable()
+        self.use_kernels = False  # Set by search(); iter_search() keeps the step-by-step loops
 
     def search(self):
-        current = self.start
-        self.path.append(current)
-        self.explored.append(current)
-        while current != self.end:
-            current = self.follow_right_hand(current)
-            if not current:
-                cprint("No path found", "magenta")
+        explored = self.explored
+        began = perf_counter()
+        self.use_kernels = self.kernels_ready
+        if self.reachable():
+            for index in self.expand():
+                explored.append(index)
+        self.finish(began, len(explored))
+        return self.path, explored
+
+    def iter_search(self):
+        """Yield explored ``(x, y)`` cells as the search reaches them.
+
+        Nothing is collected into ``self.explored``; ``self.path`` is set once
+        the generator is exhausted. The compiled kernels are never used here,
+        as they would finish the whole search before the first cell.
+        """
+        coords = self.grid.coords
+        began = perf_counter()
+        self.use_kernels = False
+        count = 0
+        if self.reachable():
+            for index in self.expand():
+                count += 1
+                yield coords(index)
+        self.finish(began, count)
+
+    def reachable(self):
+        """False only if the grid's component index is built and separates start from end."""
+        return self.grid.labels is None or self.grid.connected(self.start, self.end)
+
+    def phase(self, name):
+        """Start timing phase ``name`` (None: no phase), ending the current one."""
+        now = perf_counter()
+        if self._phase is not None:
+            previous, since = self._phase
+            self.phases[previous] = self.phases.get(previous, 0) + now - since
+        self._phase = None if name is None else (name, now)
+
+    def count_queue(self, pops, stale, remaining, initial=1, found=True):
+        """Fill ``counters`` for a search that pushes a queue entry on every relaxation.
+
+        ``remaining`` entries were never popped, ``initial`` were pushed before
+        the loop, and ``found`` says whether the goal was popped (not expanded).
+        """
+        pushes = pops + remaining
+        expanded = pops - stale - found
+        self.counters.update(
+            pushes=pushes,
+            pops=pops,
+            stale_pops=stale,
+            relaxations=pushes - initial,
+            neighbor_checks=4 * expanded,
+        )
+
+    def expand_compiled(self, scale):
+        """Run the search in ``kernels.best_first``, then replay its expansion order."""
+        grid = self.grid
+        start = grid.index(self.start)
+        end = grid.index(self.end)
+        g_score = np.full(grid.size, -1, dtype=np.int32)
+        came_from = np.full(grid.size, -1, dtype=np.int32)
+        order = np.empty(grid.size, dtype=np.int32)
+        costs = np.frombuffer(grid.costs, dtype=np.uint8)
+
+        self.phase("search")
+        expanded, pops, stale, remaining, found = kernels.best_first(
+            costs, grid.stride, start, end, scale, g_score, came_from, order
+        )
+        self.g_score = array("i", g_score.tobytes())
+        self.came_from = array("i", came_from.tobytes())
+        yield from order[:expanded].tolist()
+
+        self.count_queue(pops, stale, remaining, found=found)
+        if found:
+            self.phase("path")
+            self.path = self.reconstruct_path(self.came_from, end)
+
+    def finish(self, began, explored):
+        self.phase(None)
+        if self.sink is not None:
+            self.sink.record({
+                "solver": type(self).__name__,
+                "rows": self.rows,
+                "cols": self.cols,
+                "seconds": perf_counter() - began,
+                "explored": explored,
+                "path_length": len(self.path),
+                "counters": dict(self.counters),
+                "phases": dict(self.phases),
+            })
+
+    def reconstruct_path(self, came_from, current):
+        coords = self.grid.coords
+        path = []
+        while current >= 0:
+            path.append(coords(current))
+            current = came_from[current]
+        path.reverse()
+        return path
+
+
+class aStar(Solver):
+    has_kernel = True
+    def heuristic(self, a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def expand(self):
+        if self.use_kernels:
+            yield from self.expand_compiled(self.grid.min_cost)
+            return
+        if self.grid.weighted:
+            yield from self.expand_weighted()
+            return
+
+        grid = self.grid
+        walkable = grid.walkable
+        stride = grid.stride
+        start = grid.index(self.start)
+        end = grid.index(self.end)
+        end_y, end_x = divmod(end, stride)
+
+        self.g_score = g_score = array("i", [-1]) * grid.size
+        self.came_from = came_from = array("i", [-1]) * grid.size
+        closed = bytearray(grid.size)
+
+        g_score[start] = 0
+        # Ties on f are broken towards larger g, so the search keeps
+        # following the cell that is closest to the goal.
+        open_set = [(self.heuristic(self.start, self.end), 0, start)]
+        pops = stale = 0
+        self.phase("search")
+
+        while open_set:
+            _, neg_g, current = heapq.heappop(open_set)
+            pops += 1
+            if closed[current]:
+                stale += 1
+                continue  # Stale entry left behind by a later improvement
+
+            if current == end:
+                self.phase("path")
+                self.path = self.reconstruct_path(came_from, current)
+                break
+
+            closed[current] = 1
+            yield current
+
+            tentative_g_score = 1 - neg_g
+            for neighbor in (current - 1, current + 1, current - stride, current + stride):
+                if not walkable[neighbor] or closed[neighbor]:
+                    continue
+
+                if g_score[neighbor] < 0 or tentative_g_score < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    y, x = divmod(neighbor, stride)
+                    f_score = tentative_g_score + abs(x - end_x) + abs(y - end_y)
+                    heapq.heappush(open_set, (f_score, -tentative_g_score, neighbor))
+
+        self.count_queue(pops, stale, len(open_set), found=bool(self.path))
+
+    def expand_weighted(self):
+        """A* over terrain costs, with the Manhattan distance scaled by the cheapest cell.
+
+        Every step costs at least ``min_cost``, so the scaled heuristic still
+        never overestimates.
+        """
+        grid = self.grid
+        costs = grid.costs
+        stride = grid.stride
+        scale = grid.min_cost
+        start = grid.index(self.start)
+        end = grid.index(self.end)
+        end_y, end_x = divmod(end, stride)
+
+        self.g_score = g_score = array("i", [-1]) * grid.size
+        self.came_from = came_from = array("i", [-1]) * grid.size
+        closed = bytearray(grid.size)
+
+        g_score[start] = 0
+        open_set = [(scale * self.heuristic(self.start, self.end), 0, start)]
+        pops = stale = 0
+        self.phase("search")
+
+        while open_set:
+            _, neg_g, current = heapq.heappop(open_set)
+            pops += 1
+            if closed[current]:
+                stale += 1
+                continue
+
+            if current == end:
+                self.phase("path")
+                self.path = self.reconstruct_path(came_from, current)
                 break
-            self.path.append(current)
-            self.explored.append(current)
-        
-        return self.path, self.explored
+
+            closed[current] = 1
+            yield current
+
+            for neighbor in (current - 1, current + 1, current - stride, current + stride):
+                cost = costs[neighbor]
+                if not cost or closed[neighbor]:
+                    continue
+
+                tentative_g_score = cost - neg_g
+                if g_score[neighbor] < 0 or tentative_g_score < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    y, x = divmod(neighbor, stride)
+                    f_score = tentative_g_score + scale * (abs(x - end_x) + abs(y - end_y))
+                    heapq.heappush(open_set, (f_score, -tentative_g_score, neighbor))
+
+        self.count_queue(pops, stale, len(open_set), found=bool(self.path))
+
+
+class RightHandRule(Solver):
+    """Wall follower: keeps its right hand on the wall until it reaches the end.
+
+    The walk is deterministic, so it runs forever exactly when a (cell,
+    heading) state comes round again. A bitset with 4 bits per cell catches
+    that, and the search stops without a path. ``path`` is every step taken,
+    or with ``simplify`` the walk with each retreat cancelled against the
+    step it undoes, which in a perfect maze leaves the shortest path.
+    """
+
+    def __init__(self, maze, start, end, simplify=False):
+        super().__init__(maze, start, end)
+        stride = self.grid.stride
+        self.directions = [stride, 1, -stride, -1]  # Down, Right, Up, Left
+        self.current_direction_index = 0
+        self.simplify = simplify
+
+    def expand(self):
+        grid = self.grid
+        simplify = self.simplify
+        current = grid.index(self.start)
+        end = grid.index(self.end)
+        seen = bytearray((grid.size + 1) // 2)  # Bit 4 * cell + heading
+        seen[current >> 1] |= 1 << ((current & 1) * 4 + self.current_direction_index)
+        steps = array("i", [current])
+        yield current
+        while current != end:
+            current = self.follow_right_hand(current)
+            if current is None:
+                return  # Boxed in; the path stays empty
+
+            state = current * 4 + self.current_direction_index
+            if seen[state >> 3] & (1 << (state & 7)):
+                return  # Walking in circles
+            seen[state >> 3] |= 1 << (state & 7)
+
+            if simplify and len(steps) > 1 and steps[-2] == current:
+                steps.pop()
+            else:
+                steps.append(current)
+            yield current
+
+        coords = grid.coords
+        self.path = [coords(i) for i in steps]
 
     def follow_right_hand(self, current):
-        x, y = current
+        walkable = self.grid.walkable
         for i in range(4):
-            direction = self.directions[(self.current_direction_index + i) % 4]
-            next_x, next_y = x + direction[0], y + direction[1]
-            if self.is_valid_move(next_x, next_y):
+            next_cell = current + self.directions[(self.current_direction_index + i) % 4]
+            if walkable[next_cell]:
                 self.current_direction_index = (self.current_direction_index + i - 1) % 4
-                return next_x, next_y
+                return next_cell
         return None
 
-    def is_valid_move(self, x, y):
-        return 0 <= x < self.cols and 0 <= y < self.rows and self.maze[y][x] != "#"
-    
-class DeadEndFilling:
-    def __init__(self, maze, start, end):
-        self.original_maze = [list(row) for row in maze]
-        self.maze = [list(row) for row in maze]
-        self.start = start
-        self.end = end
-        self.rows = len(maze)
-        self.cols = len(maze[0])
-        self.explored = []
-        self.path = []
 
-class DeadEndFilling:
+class DeadEndFilling(Solver):
+    has_kernel = True
     def __init__(self, maze, start, end):
-        self.original_maze = [list(row) for row in maze]
-        self.maze = [list(row) for row in maze]
-        self.start = start
-        self.end = end
-        self.rows = len(maze)
-        self.cols = len(maze[0])
-        self.explored = []
-        self.path = []
+        super().__init__(maze, start, end)
+        # Cells still open; dead ends are filled in here, the grid is untouched
+        self.open = bytearray(self.grid.walkable)
 
-    def search(self):
-        while True:
-            self.mark_dead_ends()
-            if self.is_path_to_end():
-                self.path = self.find_path(self.start, self.end)
-                return self.path, self.explored
-            else:
-                return [], self.explored
+    def expand(self):
+        self.phase("fill")
+        yield from self.mark_dead_ends()
+        self.phase("path")
+        self.path = self.find_path(self.start, self.end)
 
     def mark_dead_ends(self):
-        while True:
-            dead_ends_found = False
-            for y in range(self.rows):
-                for x in range(self.cols):
-                    if self.maze[y][x] == "." and self.is_dead_end((x, y)):
-                        self.remove_dead_end((x, y))
-                        dead_ends_found = True
-                        self.explored.append((x, y))
-            if not dead_ends_found:
-                break
-
-    def is_dead_end(self, node):
-        x, y = node
-        neighbors = self.get_neighbors(node)
-        return len(neighbors) == 1
-
-    def remove_dead_end(self, node):
-        x, y = node
-        self.maze[y][x] = "#"  # Mark dead end as wall
-
-    def is_path_to_end(self):
-        return bool(self.find_path(self.start, self.end))
+        """Fill dead ends in the order repeated row-major scans would find them.
+
+        Every open cell's degree is computed once. Filling a cell decrements its
+        neighbours' degrees and queues any that become dead ends: later in scan
+        order they join the current pass, earlier ones wait for the next pass.
+        """
+        grid = self.grid
+        stride = grid.stride
+        is_open = self.open
+
+        open_mask = np.frombuffer(is_open, dtype=np.uint8)
+        degree = np.zeros(grid.size, dtype=np.uint8)
+        degree[stride:-stride] = (
+            open_mask[stride - 1 : -stride - 1]
+            + open_mask[stride + 1 : -stride + 1]
+            + open_mask[: -2 * stride]
+            + open_mask[2 * stride :]
+        )
+        # Every walkable cell may be filled except the endpoints this search was given
+        fillable = np.frombuffer(grid.walkable, dtype=np.uint8).astype(bool)
+        fillable[grid.index(self.start)] = fillable[grid.index(self.end)] = False
+        current_pass = np.flatnonzero(fillable & (open_mask == 1) & (degree == 1))
+        if self.use_kernels:
+            order = np.empty(grid.size, dtype=np.int32)
+            filled, passes, stale = kernels.dead_ends(open_mask, degree, fillable, stride, current_pass, order)
+            yield from order[:filled].tolist()
+            self.counters.update(passes=passes, pops=filled + stale, stale_pops=stale)
+            return
+
+        current_pass = current_pass.tolist()
+        degree = bytearray(degree.tobytes())
+        fillable = bytearray(fillable.tobytes())
+
+        next_pass = []
+        passes = stale = 0
+        while current_pass:
+            passes += 1
+            while current_pass:
+                i = heapq.heappop(current_pass)
+                if degree[i] != 1:
+                    stale += 1
+                    continue  # Its last neighbour was filled first
+
+                is_open[i] = 0  # Mark dead end as wall
+                yield i
+                for neighbor in (i - 1, i + 1, i - stride, i + stride):
+                    if is_open[neighbor]:
+                        degree[neighbor] -= 1
+                        if degree[neighbor] == 1 and fillable[neighbor]:
+                            if neighbor > i:
+                                heapq.heappush(current_pass, neighbor)
+                            else:
+                                next_pass.append(neighbor)
+            next_pass.sort()
+            current_pass, next_pass = next_pass, []
+        filled = grid.walkable.count(1) - is_open.count(1)
+        self.counters.update(passes=passes, pops=filled + stale, stale_pops=stale)
 
     def find_path(self, start, end):
-        queue = [start]
-        came_from = {start: None}
+        is_open = self.open
+        start = self.grid.index(start)
+        end = self.grid.index(end)
+        came_from = array("i", [-1]) * self.grid.size
+        visited = bytearray(self.grid.size)
+        visited[start] = 1
+        queue = deque([start])
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             if current == end:
                 return self.reconstruct_path(came_from, end)
-            for neighbor in self.get_neighbors(current):
-                if neighbor not in came_from and self.maze[neighbor[1]][neighbor[0]] == ".":
+            for neighbor in self.grid.neighbors(current):
+                if is_open[neighbor] and not visited[neighbor]:
+                    visited[neighbor] = 1
                     came_from[neighbor] = current
                     queue.append(neighbor)
         return []
 
-    def reconstruct_path(self, came_from, current):
-        path = []
-        while current is not None:
-            path.append(current)
-            current = came_from.get(current)
-        path.reverse()
-        return path
 
-    def get_neighbors(self, node):
-        x, y = node
-        neighbors = []
-        if x > 0 and self.maze[y][x - 1] != "#":  # Left
-            neighbors.append((x - 1, y))
-        if x < self.cols - 1 and self.maze[y][x + 1] != "#":  # Right
-            neighbors.append((x + 1, y))
-        if y > 0 and self.maze[y - 1][x] != "#":  # Up
-            neighbors.append((x, y - 1))
-        if y < self.rows - 1 and self.maze[y + 1][x] != "#":  # Down
-            neighbors.append((x, y + 1))
-        return neighbors
-
-class Dijkstra:
-    def __init__(self, maze, start, end):
-        self.maze = maze
-        self.start = start
-        self.end = end
-        self.rows = len(maze)
-        self.cols = len(maze[0])
-        self.open_set = []
-        self.came_from = {}
-        self.g_score = {}
-        self.explored = []
+class Dijkstra(Solver):
+    has_kernel = True
+    def expand(self):
+        if self.use_kernels:
+            yield from self.expand_compiled(0)
+            return
 
-    def search(self):
-        heapq.heappush(self.open_set, (0, self.start))
-        self.came_from[self.start] = None
-        self.g_score[self.start] = 0
+        grid = self.grid
+        walkable = grid.walkable
+        stride = grid.stride
+        start = grid.index(self.start)
+        end = grid.index(self.end)
 
-        while self.open_set:
-            current_cost, current = heapq.heappop(self.open_set)
-            
-            if current == self.end:
-                return self.reconstruct_path(current), self.explored
+        self.g_score = g_score = array("i", [-1]) * grid.size
+        self.came_from = came_from = array("i", [-1]) * grid.size
 
-            self.explored.append(current)
+        g_score[start] = 0
+        open_set = [(0, start)]
 
-            for neighbor in self.get_neighbors(current):
-                tentative_g_score = self.g_score.get(current, float("inf")) + 1
+        # Weighted mazes take the cost of the cell stepped onto instead of 1
+        costs = grid.costs if grid.weighted else None
+        pops = stale = 0
+        self.phase("search")
 
-                if neighbor not in self.g_score or tentative_g_score < self.g_score[neighbor]:
-                    self.came_from[neighbor] = current
-                    self.g_score[neighbor] = tentative_g_score
-                    heapq.heappush(self.open_set, (tentative_g_score, neighbor))
+        while open_set:
+            current_cost, current = heapq.heappop(open_set)
+            pops += 1
+            if current_cost > g_score[current]:
+                stale += 1
+                continue
 
-        return [], self.explored
+            if current == end:
+                self.phase("path")
+                self.path = self.reconstruct_path(came_from, current)
+                break
 
-    def get_neighbors(self, node):
-        x, y = node
-        neighbors = []
-        if x > 0 and self.maze[y][x - 1] != "#":  # Left
-            neighbors.append((x - 1, y))
-        if x < self.cols - 1 and self.maze[y][x + 1] != "#":  # Right
-            neighbors.append((x + 1, y))
-        if y > 0 and self.maze[y - 1][x] != "#":  # Up
-            neighbors.append((x, y - 1))
-        if y < self.rows - 1 and self.maze[y + 1][x] != "#":  # Down
-            neighbors.append((x, y + 1))
-        return neighbors
-
-    def reconstruct_path(self, current):
-        path = []
-        while current in self.came_from:
-            path.append(current)
-            current = self.came_from[current]
-        path.reverse()
-        return path
+            yield current
+
+            if costs:
+                for neighbor in (current - 1, current + 1, current - stride, current + stride):
+                    tentative_g_score = current_cost + costs[neighbor]
+                    if costs[neighbor] and (
+                        g_score[neighbor] < 0 or tentative_g_score < g_score[neighbor]
+                    ):
+                        came_from[neighbor] = current
+                        g_score[neighbor] = tentative_g_score
+                        heapq.heappush(open_set, (tentative_g_score, neighbor))
+                continue
+
+            tentative_g_score = current_cost + 1
+            for neighbor in (current - 1, current + 1, current - stride, current + stride):
+                if walkable[neighbor] and (
+                    g_score[neighbor] < 0 or tentative_g_score < g_score[neighbor]
+                ):
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    heapq.heappush(open_set, (tentative_g_score, neighbor))
+
+        self.count_queue(pops, stale, len(open_set), found=bool(self.path))
+
+
+class DialDijkstra(Solver):
+    """Dijkstra with Dial's bucket queue, for small integer terrain costs.
+
+    Every tentative distance lies within ``max_cost`` of the distance being
+    expanded, so ``max_cost + 1`` buckets reused round-robin replace the heap:
+    a push is a list append and finding the next cell scans at most
+    ``max_cost`` empty buckets.
+    """
+
+    def expand(self):
+        grid = self.grid
+        costs = grid.costs
+        stride = grid.stride
+        start = grid.index(self.start)
+        end = grid.index(self.end)
+
+        self.g_score = g_score = array("i", [-1]) * grid.size
+        self.came_from = came_from = array("i", [-1]) * grid.size
+
+        slots = grid.max_cost + 1
+        buckets = [[] for _ in range(slots)]
+        g_score[start] = 0
+        buckets[0].append(start)
+        pushes = 1
+        pops = stale = 0
+        distance = 0
+        self.phase("search")
+
+        while pops < pushes:
+            bucket = buckets[distance % slots]
+            while not bucket:
+                distance += 1
+                bucket = buckets[distance % slots]
+
+            # Costs are at least 1, so nothing lands in this bucket while it is drained
+            for current in bucket:
+                pops += 1
+                if g_score[current] != distance:
+                    stale += 1
+                    continue  # Stale entry left behind by a later improvement
+
+                if current == end:
+                    self.phase("path")
+                    self.path = self.reconstruct_path(came_from, current)
+                    break
+
+                yield current
+
+                for neighbor in (current - 1, current + 1, current - stride, current + stride):
+                    cost = costs[neighbor]
+                    if cost:
+                        tentative_g_score = distance + cost
+                        if g_score[neighbor] < 0 or tentative_g_score < g_score[neighbor]:
+                            came_from[neighbor] = current
+                            g_score[neighbor] = tentative_g_score
+                            buckets[tentative_g_score % slots].append(neighbor)
+                            pushes += 1
+            if self.path:
+                break
+            bucket.clear()
+            distance += 1
+
+        self.count_queue(pops, stale, pushes - pops, found=bool(self.path))
+
+
+# Which search of a bidirectional solver expanded a cell
+FORWARD = 0
+BACKWARD = 1
+
+
+class BidirectionalDijkstra(Solver):
+    """Dijkstra grown from ``start`` and ``end`` at the same time.
+
+    Each step expands the side whose queue top is smaller. Whenever one side
+    labels a cell the other side has already labelled, the two half paths give
+    a candidate length ``best``. The search stops once the queue tops sum to at
+    least ``best``: no unexpanded cell can be on a shorter path then.
+    ``sides`` records which search (``FORWARD``/``BACKWARD``) expanded each
+    explored cell, in the same order.
+    """
+
+    unit_cost = True
+    guided = False  # Whether queue keys include the BidirectionalAStar potential
+
+    def __init__(self, maze, start, end):
+        super().__init__(maze, start, end)
+        self.sides = bytearray()
+
+    def expand(self):
+        grid = self.grid
+        walkable = grid.walkable
+        stride = grid.stride
+        guided = self.guided
+        sides = self.sides
+        start = grid.index(self.start)
+        end = grid.index(self.end)
+        start_y, start_x = divmod(start, stride)
+        end_y, end_x = divmod(end, stride)
+
+        # Keys are doubled costs so the halved potentials stay integers
+        def potential(index):
+            y, x = divmod(index, stride)
+            return abs(x - end_x) + abs(y - end_y) - abs(x - start_x) - abs(y - start_y)
+
+        g_scores = (array("i", [-1]) * grid.size, array("i", [-1]) * grid.size)
+        came_from = (array("i", [-1]) * grid.size, array("i", [-1]) * grid.size)
+        closed = (bytearray(grid.size), bytearray(grid.size))
+
+        g_scores[FORWARD][start] = 0
+        g_scores[BACKWARD][end] = 0
+        first = potential(start) if guided else 0
+        queues = ([(first, 0, start)], [(first, 0, end)])
+        best, meet = (0, start) if start == end else (-1, -1)
+        stale = 0
+        self.phase("search")
+
+        while queues[FORWARD] and queues[BACKWARD]:
+            top_forward = queues[FORWARD][0][0]
+            top_backward = queues[BACKWARD][0][0]
+            if best >= 0 and top_forward + top_backward >= 2 * best:
+                break
+
+            side = FORWARD if top_forward <= top_backward else BACKWARD
+            queue, g_score, parent, done = queues[side], g_scores[side], came_from[side], closed[side]
+            other_g_score = g_scores[1 - side]
+            sign = 1 if side == FORWARD else -1
+
+            _, neg_g, current = heapq.heappop(queue)
+            if done[current]:
+                stale += 1
+                continue  # Stale entry left behind by a later improvement
+
+            done[current] = 1
+            sides.append(side)
+            yield current
+
+            tentative_g_score = 1 - neg_g
+            for neighbor in (current - 1, current + 1, current - stride, current + stride):
+                if not walkable[neighbor] or done[neighbor]:
+                    continue
+
+                if g_score[neighbor] < 0 or tentative_g_score < g_score[neighbor]:
+                    parent[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    key = 2 * tentative_g_score
+                    if guided:
+                        key += sign * potential(neighbor)
+                    heapq.heappush(queue, (key, -tentative_g_score, neighbor))
+
+                    # The two searches touch here
+                    other = other_g_score[neighbor]
+                    if other >= 0 and (best < 0 or tentative_g_score + other < best):
+                        best, meet = tentative_g_score + other, neighbor
+
+        remaining = len(queues[FORWARD]) + len(queues[BACKWARD])
+        self.count_queue(len(sides) + stale, stale, remaining, initial=2, found=False)
+        if best < 0:
+            return
+
+        # Join the forward chain up to the meeting cell with the backward chain after it
+        self.phase("path")
+        path = self.reconstruct_path(came_from[FORWARD], meet)
+        coords = grid.coords
+        current = came_from[BACKWARD][meet]
+        while current >= 0:
+            path.append(coords(current))
+            current = came_from[BACKWARD][current]
+        self.path = path
+
+
+class BidirectionalAStar(BidirectionalDijkstra):
+    """Bidirectional A* with average potentials.
+
+    The forward side is guided by half of (distance to ``end`` - distance to
+    ``start``) and the backward side by its negation. Both are consistent and
+    sum to a constant, so the stopping rule of ``BidirectionalDijkstra`` stays
+    exact, unlike guiding each side by the plain Manhattan distance.
+    """
+
+    guided = True
+
+
+class FrontierBFS(Solver):
+    unit_cost = True
+
+    def expand(self):
+        grid = self.grid
+        start = grid.index(self.start)
+        end = grid.index(self.end)
+        self.distance = np.full(grid.size, -1, dtype=np.int32)
+        layers = 0
+        self.phase("search")
+        for frontier in frontier_layers(grid, self.distance, [start], end):
+            layers += 1
+            yield from frontier.tolist()
+        self.counters["layers"] = layers
+        if self.distance[end] < 0:
+            return
+
+        self.phase("path")
+        coords = grid.coords
+        self.path = [coords(i) for i in reversed(descend(grid, self.distance, end))]
+
+
+def jump_tables(grid):
+    """JPS+ jump distances for every cell and direction of a 4-connected grid.
+
+    Returns a dict mapping each neighbour offset to an ``array('i')`` over the
+    grid. A positive entry is the distance to the next jump point in that
+    direction; otherwise its negation is the number of open cells before the
+    next wall. Horizontal runs stop at cells with a forced vertical neighbour;
+    vertical runs also stop wherever a horizontal run would find a jump point.
+    """
+    walkable = grid.walkable
+    stride = grid.stride
+    cells = [i for i in range(grid.size) if walkable[i]]
+    tables = {}
+
+    def fill(d, forced):
+        table = array("i", [0]) * grid.size
+        for c in reversed(cells) if d > 0 else cells:
+            n = c + d
+            if not walkable[n]:
+                continue
+            if forced(n, d):
+                table[c] = 1
+            else:
+                v = table[n]
+                table[c] = v + 1 if v > 0 else v - 1
+        tables[d] = table
+
+    def forced_horizontal(n, d):
+        return (walkable[n - stride] and not walkable[n - d - stride]) or (
+            walkable[n + stride] and not walkable[n - d + stride]
+        )
+
+    def forced_vertical(n, d):
+        return (
+            (walkable[n - 1] and not walkable[n - 1 - d])
+            or (walkable[n + 1] and not walkable[n + 1 - d])
+            or right[n] > 0
+            or left[n] > 0
+        )
+
+    fill(1, forced_horizontal)
+    fill(-1, forced_horizontal)
+    right, left = tables[1], tables[-1]
+    fill(stride, forced_vertical)
+    fill(-stride, forced_vertical)
+    return tables
+
+
+class JumpPointSearch(Solver):
+    """Jump Point Search (JPS+) for 4-connected, uniform-cost grids.
+
+    A* runs over jump points only; straight runs between them are skipped using
+    precomputed jump tables, which are kept on the grid and shared by every
+    later search. ``explored`` holds the jump points that were expanded.
+    """
+
+    unit_cost = True
+
+    def expand(self):
+        grid = self.grid
+        stride = grid.stride
+        if grid.jumps is None:
+            self.phase("tables")
+            grid.jumps = jump_tables(grid)
+        jumps = grid.jumps
+        start = grid.index(self.start)
+        end = grid.index(self.end)
+        end_y, end_x = divmod(end, stride)
+
+        def jump(c, d):
+            """The next jump point from ``c`` in direction ``d`` (or None), and its distance."""
+            v = jumps[d][c]
+            run = v if v > 0 else -v
+            y, x = divmod(c, stride)
+            if d == 1 or d == -1:
+                k = (end_x - x) * d
+                if y == end_y and 0 < k <= run:
+                    return end, k
+            else:
+                k = (end_y - y) * (1 if d > 0 else -1)
+                if 0 < k <= run and (v <= 0 or k < v):
+                    # The goal row: stop if the goal is there or within horizontal reach
+                    n = c + k * d
+                    h = 1 if end_x > x else -1
+                    if n == end or abs(end_x - x) <= abs(jumps[h][n]):
+                        return n, k
+            if v > 0:
+                return c + v * d, v
+            return None, 0
+
+        g_score = {start: 0}
+        came_from = {start: -1}
+        closed = set()
+        y, x = divmod(start, stride)
+        open_set = [(abs(x - end_x) + abs(y - end_y), 0, start)]
+        pops = stale = jumped = 0
+        self.phase("search")
+
+        while open_set:
+            _, neg_g, current = heapq.heappop(open_set)
+            pops += 1
+            if current in closed:
+                stale += 1
+                continue
+            if current == end:
+                break
+            closed.add(current)
+            yield current
+
+            # Prune to the natural directions for the way the node was entered
+            parent = came_from[current]
+            if parent < 0:
+                directions = grid.offsets
+            else:
+                diff = current - parent
+                if -stride < diff < stride:
+                    d = 1 if diff > 0 else -1
+                    directions = (d, stride, -stride)
+                else:
+                    d = stride if diff > 0 else -stride
+                    directions = (d, 1, -1)
+
+            jumped += len(directions)
+            for d in directions:
+                successor, distance = jump(current, d)
+                if successor is None or successor in closed:
+                    continue
+                g = -neg_g + distance
+                if successor not in g_score or g < g_score[successor]:
+                    g_score[successor] = g
+                    came_from[successor] = current
+                    y, x = divmod(successor, stride)
+                    heapq.heappush(open_set, (g + abs(x - end_x) + abs(y - end_y), -g, successor))
+
+        self.count_queue(pops, stale, len(open_set), found=current == end)
+        self.counters["neighbor_checks"] = jumped  # One jump table lookup per direction
+        if current != end:
+            return
+
+        # Fill in the straight runs between consecutive jump points
+        self.phase("path")
+        cells = [end]
+        current = end
+        while came_from[current] >= 0:
+            parent = came_from[current]
+            diff = current - parent
+            step = (1 if diff > 0 else -1) if -stride < diff < stride else (stride if diff > 0 else -stride)
+            while current != parent:
+                current -= step
+                cells.append(current)
+        cells.reverse()
+        self.path = [grid.coords(i) for i in cells]
@@ -1,225 +1,187 @@
-import pygame
+import argparse
+import json
 import sys
+import time
+from pathlib import Path
+import numpy as np
 from termcolor import cprint
-from logic import aStar, DeadEndFilling, Dijkstra
+import logic
+from logic import Grid, OPEN
+import oracle
+import render
+import stats
+
+SOLVERS = {
+    "aStar": logic.aStar,
+    "Dijkstra": logic.Dijkstra,
+    "DialDijkstra": logic.DialDijkstra,
+    "BidirectionalDijkstra": logic.BidirectionalDijkstra,
+    "BidirectionalAStar": logic.BidirectionalAStar,
+    "DeadEndFilling": logic.DeadEndFilling,
+    "RightHandRule": logic.RightHandRule,
+    "FrontierBFS": logic.FrontierBFS,
+    "JumpPointSearch": logic.JumpPointSearch,
+    "Oracle": oracle.OracleSolver,
+}
+
+# Constants
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+START_COLOR = (0, 255, 0)
+EXPLORED_COLOR = (200, 200, 200)
+BACKWARD_EXPLORED_COLOR = (170, 200, 240)  # Cells a bidirectional solver reached from the end
+TERRAIN_COLORS = {str(cost): (255 - 14 * cost, 235 - 18 * cost, 190 - 18 * cost) for cost in range(1, 10)}
+
+# Single mode
+CELL_SIZE = 3
+END_COLOR = (255, 0, 0)
+PATH_COLOR = (255, 0, 0)
+OUTPUT_FILE = "maze_visualization.png"
+
+# Race mode
+RACE_CELL_SIZE = 20
+RACE_END_COLOR = (0, 0, 255)
+RACE_PATH_COLOR = (0, 0, 255)
+RHR_PATH_COLOR = (255, 165, 0)
+RHR_EXPLORED_COLOR = (200, 200, 200)
+
+
+# Function to load maze from a file
+def load_maze(file_path):
+    with open(file_path, "r") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+# Function to load a maze file of either format into a Grid
+def load_grid(file_path):
+    if str(file_path).endswith(".maze"):
+        import mazefile
+
+        return mazefile.load(file_path).grid()
+    return Grid(load_maze(file_path))
+
+
+# Function to locate the start and end cells
+def find_endpoints(grid):
+    start, end = grid.find("S"), grid.find("E")
+    if not start or not end:
+        raise ValueError("Start or End position not found in the maze file.")
+    return start, end
 
-single = input("Do you want to run the program in single or race mode? (r/s): ")
 
-if single.lower() == "s":
-    pygame.init()
+# Function to render the maze as a cell-resolution image
+def maze_image(grid, end_color=END_COLOR):
+    colors = {"#": BLACK, ".": WHITE, "S": START_COLOR, "E": end_color, **TERRAIN_COLORS}
+    return render.cell_image(grid, colors)
 
-    # Constants
-    CELL_SIZE = 3
-    BLACK = (0, 0, 0)
-    WHITE = (255, 255, 255)
-    START_COLOR = (0, 255, 0)
-    END_COLOR = (255, 0, 0)
-    PATH_COLOR = (255, 0, 0)
-    EXPLORED_COLOR = (200, 200, 200)
-    DELAY_MS = 0
-    OUTPUT_FILE = "maze_visualization.png"
-
-
-    # Function to load maze from a file
-    def load_maze(file_path):
-        with open(file_path, "r") as file:
-            maze = [line.strip() for line in file.readlines()]
-        return maze
-
-
-    # Function to draw the maze on the surface
-    def draw_maze(surface):
-        for y, row in enumerate(maze):
-            for x, cell in enumerate(row):
-                rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                if cell == "#":
-                    pygame.draw.rect(surface, BLACK, rect)
-                elif cell == ".":
-                    pygame.draw.rect(surface, WHITE, rect)
-                elif cell == "S":
-                    pygame.draw.rect(surface, START_COLOR, rect)
-                elif cell == "E":
-                    pygame.draw.rect(surface, END_COLOR, rect)
-
-
-    # Function to draw explored cells and path
-    def draw_explored_path(surface, explored, path):
-        if explored:
-            for x, y in explored:
-                rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                pygame.draw.rect(surface, EXPLORED_COLOR, rect)
-        if path:
-            for x, y in path:
-                rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                pygame.draw.rect(surface, PATH_COLOR, rect)
-
-
-    # Load maze and initialize variables
-    maze = load_maze("maze.txt")
-    start = None
-    end = None
-    for y, row in enumerate(maze):
-        for x, cell in enumerate(row):
-            if cell == "S":
-                start = (x, y)
-            elif cell == "E":
-                end = (x, y)
 
-    if not start or not end:
-        raise ValueError("Start or End position not found in the maze file.")
+# Function to pick the colour of an explored cell, by side for bidirectional solvers
+def side_color(solver, n, color=EXPLORED_COLOR):
+    sides = getattr(solver, "sides", None)
+    return BACKWARD_EXPLORED_COLOR if sides and sides[n] == logic.BACKWARD else color
 
-    # Calculate dimensions
-    ROWS = len(maze)
-    COLS = len(maze[0])
-    WIDTH = COLS * CELL_SIZE
-    HEIGHT = ROWS * CELL_SIZE
 
-    # Find the path using A* algorithm
-    astar = DeadEndFilling(maze, start, end)
-    path, explored = astar.search()
-    cprint(path, "red")
+# Function to save the solved maze as a PNG
+def save_png(solver, explored, output_file):
+    import pygame
 
-    # Ask the user for their choice
-    choice = input("Do you want to visualize the maze with Pygame (y/n)? ").strip().lower()
+    image = maze_image(solver.grid)
+    render.paint(image, explored.indices, EXPLORED_COLOR)
+    if getattr(solver, "sides", None):
+        backward = np.frombuffer(solver.sides, dtype=np.uint8) == logic.BACKWARD
+        render.paint(image, np.asarray(explored.indices)[backward], BACKWARD_EXPLORED_COLOR)
+    render.paint(image, [solver.grid.index(cell) for cell in solver.path], PATH_COLOR)
+    pygame.image.save(render.to_surface(image, CELL_SIZE), output_file)
+    cprint(f"Visualization saved to {output_file}", "green", attrs=["bold"])
 
-    if choice == "y":
-        # Pygame visualization
-        screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Maze Visualization")
-
-        # Create an off-screen surface to draw on
-        surface = pygame.Surface((WIDTH, HEIGHT))
-        surface.fill(WHITE)
-
-        # Draw the maze
-        draw_maze(surface)
-
-        # Main loop
-        running = True
-        explored_steps = 0  # Variable to keep track of explored steps
-        path_step = 0  # Variable to keep track of path steps
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-
-            screen.fill(WHITE)  # Fill background with white
-            screen.blit(surface, (0, 0))
-
-            # Draw explored cells up to the current explored step
-            if explored:
-                for x, y in explored[:explored_steps]:
-                    rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                    pygame.draw.rect(screen, EXPLORED_COLOR, rect)
-
-            # Draw the path up to the current path step
-            if path:
-                for x, y in path[: path_step + 1]:
-                    rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                    pygame.draw.rect(screen, PATH_COLOR, rect)
-
-            pygame.display.flip()
-
-            # Increment steps and delay
-            if explored_steps < len(explored):
-                explored_steps += 1
-            elif path_step < len(path):
-                path_step += 1
-
-        pygame.quit()
 
-    else:
-        # Save as PNG
-        surface = pygame.Surface((WIDTH, HEIGHT))
-        surface.fill(WHITE)
+# Animate a single solver in a window
+def show_single(solver):
+    import pygame
 
-        # Draw the maze and the path
-        draw_maze(surface)
-        draw_explored_path(surface, explored, path)
+    pygame.init()
+    width, height = solver.cols * CELL_SIZE, solver.rows * CELL_SIZE
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption("Maze Visualization")
 
-        # Save the surface to a PNG file
-        pygame.image.save(surface, OUTPUT_FILE)
-        cprint(f"Visualization saved to {OUTPUT_FILE}", "green", attrs=["bold"])
+    # Create a persistent off-screen surface; each frame only adds new cells
+    surface = pygame.Surface((width, height))
+    render.blit(surface, maze_image(solver.grid), CELL_SIZE)
 
-else:
-    
-    pygame.init()
+    def draw_cell(cell, color):
+        x, y = cell
+        pygame.draw.rect(surface, color, pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
 
-    # Constants
-    CELL_SIZE = 20
-    BLACK = (0, 0, 0)
-    WHITE = (255, 255, 255)
-    START_COLOR = (0, 255, 0)
-    END_COLOR = (0, 0, 255)
-    PATH_COLOR = (0, 0, 255)
-    EXPLORED_COLOR = (200, 200, 200)
-    RHR_PATH_COLOR = (255, 165, 0)
-    RHR_EXPLORED_COLOR = (200, 200, 200)
-
-    # Function to load maze from a file
-    def load_maze(file_path):
-        with open(file_path, "r") as file:
-            return [list(line.strip()) for line in file.readlines()]
-
-    # Function to draw the maze on the surface
-    def draw_maze(surface, maze):
-        color_map = {"#": BLACK, ".": WHITE, "S": START_COLOR, "E": END_COLOR}
-        for y, row in enumerate(maze):
-            for x, cell in enumerate(row):
-                rect = pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                pygame.draw.rect(surface, color_map.get(cell, WHITE), rect)
-
-    # Function to draw explored cells and path
-    def draw_explored_path(surface, explored, path, explored_color, path_color):
-        for x, y in explored:
-            pygame.draw.rect(surface, explored_color, pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-        for x, y in path:
-            pygame.draw.rect(surface, path_color, pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-
-    def color_remaining_white_cells(surface, maze, explored, path, color):
-        explored_set = set(explored)
-        path_set = set(path)
-        for y, row in enumerate(maze):
-            for x, cell in enumerate(row):
-                if cell == "." and (x, y) not in explored_set and (x, y) not in path_set:
-                    pygame.draw.rect(surface, color, pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-
-    # Load maze and initialize variables
-    maze = load_maze("maze.txt")
-    start = next((x, y) for y, row in enumerate(maze) for x, cell in enumerate(row) if cell == "S")
-    end = next((x, y) for y, row in enumerate(maze) for x, cell in enumerate(row) if cell == "E")
+    # Main loop
+    running = True
+    events = solver.iter_search()
+    searching = True
+    path_step = 0  # Variable to keep track of path steps
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+        # Draw the newly explored cell, then the path one cell at a time
+        if searching:
+            cell = next(events, None)
+            if cell is None:
+                searching = False
+                cprint(solver.path, "red")
+            else:
+                draw_cell(cell, side_color(solver, -1))
+        elif path_step < len(solver.path):
+            draw_cell(solver.path[path_step], PATH_COLOR)
+            path_step += 1
+
+        screen.blit(surface, (0, 0))
+        pygame.display.flip()
 
-    if not start or not end:
-        raise ValueError("Start or End position not found in the maze file.")
+    pygame.quit()
 
-    # Calculate dimensions
-    ROWS, COLS = len(maze), len(maze[0])
-    WIDTH, HEIGHT = COLS * CELL_SIZE, ROWS * CELL_SIZE
-    SURFACE_WIDTH, SURFACE_HEIGHT = WIDTH * 2, HEIGHT
 
-    # Setup surfaces
-    screen = pygame.display.set_mode((SURFACE_WIDTH, SURFACE_HEIGHT))
-    pygame.display.set_caption("Maze Visualization")
+# Race two solvers side by side
+def show_race(maze, left="DeadEndFilling", right="Dijkstra"):
+    import pygame
 
-    surface_astar = pygame.Surface((WIDTH, HEIGHT))
-    surface_rhr = pygame.Surface((WIDTH, HEIGHT))
+    pygame.init()
+    cell_size = RACE_CELL_SIZE
+
+    # Function to colour the cells dead end filling left open
+    def color_remaining_white_cells(surface, solver, color):
+        grid = solver.grid
+        remaining = (np.frombuffer(grid.cells, dtype=np.uint8) == OPEN) & np.frombuffer(solver.open, dtype=bool)
+        remaining[[grid.index(cell) for cell in solver.path]] = False
+        render.fill_cells(surface, grid, np.flatnonzero(remaining), color, cell_size)
+
+    # Draw a solver's progress onto its surface, one cell per frame
+    def animate(solver, surface, explored_color, path_color):
+        for x, y in solver.iter_search():
+            color = side_color(solver, -1, explored_color)
+            pygame.draw.rect(surface, color, pygame.Rect(x * cell_size, y * cell_size, cell_size, cell_size))
+            yield
+        for x, y in solver.path:
+            pygame.draw.rect(surface, path_color, pygame.Rect(x * cell_size, y * cell_size, cell_size, cell_size))
+            yield
+        if hasattr(solver, "open"):
+            color_remaining_white_cells(surface, solver, path_color)
+
+    grid = maze if isinstance(maze, Grid) else Grid(maze)
+    start, end = find_endpoints(grid)
+    width, height = grid.cols * cell_size, grid.rows * cell_size
 
-    draw_maze(surface_astar, maze)
-    draw_maze(surface_rhr, maze)
+    # Setup surfaces
+    screen = pygame.display.set_mode((width * 2, height))
+    pygame.display.set_caption("Maze Visualization")
 
-    # Initialize algorithms
-    astar = Dijkstra(maze, start, end)
-    path_a_star, explored_a_star = astar.search()
-    
-    rhr = DeadEndFilling(maze, start, end)
-    path_rhr, explored_rhr = rhr.search()
+    surface_left = pygame.Surface((width, height))
+    surface_right = pygame.Surface((width, height))
+    render.blit(surface_left, maze_image(grid, RACE_END_COLOR), cell_size)
+    render.blit(surface_right, maze_image(grid, RACE_END_COLOR), cell_size)
 
     # Real-time visualization
-    explored_steps_astar = 0
-    path_step_astar = 0
-    explored_steps_rhr = 0
-    path_step_rhr = 0
-    rhr_done = False
+    frames_left = animate(SOLVERS[left](grid, start, end), surface_left, RHR_EXPLORED_COLOR, RHR_PATH_COLOR)
+    frames_right = animate(SOLVERS[right](grid, start, end), surface_right, EXPLORED_COLOR, RACE_PATH_COLOR)
 
     clock = pygame.time.Clock()
 
@@ -227,38 +189,124 @@ else:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
-                sys.exit()
-
-        # Clear the screen
-        screen.fill(WHITE)
-        
-        # Draw A* maze and path
-        draw_maze(surface_astar, maze)
-        draw_explored_path(surface_astar, explored_a_star[:explored_steps_astar], path_a_star[:path_step_astar + 1], EXPLORED_COLOR, PATH_COLOR)
-        screen.blit(surface_astar, (WIDTH, 0))
-
-        # Draw Right Hand Rule maze and path
-        draw_maze(surface_rhr, maze)
-        draw_explored_path(surface_rhr, explored_rhr[:explored_steps_rhr], path_rhr[:path_step_rhr + 1], RHR_EXPLORED_COLOR, RHR_PATH_COLOR)
-        
-        if rhr_done:
-            color_remaining_white_cells(surface_rhr, maze, explored_rhr, path_rhr, RHR_PATH_COLOR)
-            
-        screen.blit(surface_rhr, (0, 0))
+                return
+
+        # Advance both solvers by one step on their persistent surfaces
+        next(frames_left, None)
+        next(frames_right, None)
+
+        screen.blit(surface_right, (width, 0))
+        screen.blit(surface_left, (0, 0))
         pygame.display.flip()
 
-        # Increment steps
-        if explored_steps_astar < len(explored_a_star):
-            explored_steps_astar += 1
-        elif path_step_astar < len(path_a_star):
-            path_step_astar += 1
-
-        if explored_steps_rhr < len(explored_rhr):
-            explored_steps_rhr += 1
-        elif path_step_rhr < len(path_rhr):
-            path_step_rhr += 1
-        elif not rhr_done:
-            rhr_done = True
-            color_remaining_white_cells(surface_rhr, maze, explored_rhr, path_rhr, RHR_PATH_COLOR)
-            
         clock.tick(60)
+
+
+# Argument type for counts that must be at least 1
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+# Solve one maze file, repeating the solve to get stable timings
+def solve(maze_file, solver_name, repeat=1):
+    grid = load_grid(maze_file)
+    start, end = find_endpoints(grid)
+    timings = []
+    for _ in range(repeat):
+        solver = SOLVERS[solver_name](grid, start, end)
+        began = time.perf_counter()
+        path, explored = solver.search()
+        timings.append(time.perf_counter() - began)
+    return solver, explored, timings
+
+
+def interactive():
+    single = input("Do you want to run the program in single or race mode? (r/s): ")
+    if single.lower() != "s":
+        show_race(load_maze("maze.txt"))
+        return
+
+    grid = Grid(load_maze("maze.txt"))
+    start, end = find_endpoints(grid)
+
+    # Find the path using Dead End Filling
+    solver = logic.DeadEndFilling(grid, start, end)
+
+    # Ask the user for their choice
+    choice = input("Do you want to visualize the maze with Pygame (y/n)? ").strip().lower()
+    if choice == "y":
+        show_single(solver)
+    else:
+        path, explored = solver.search()
+        cprint(path, "red")
+        save_png(solver, explored, OUTPUT_FILE)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        interactive()
+        return
+
+    parser = argparse.ArgumentParser(description="Solve maze files without any prompts.")
+    parser.add_argument("mazes", nargs="+", help="maze .txt or binary .maze files")
+    parser.add_argument("--solver", default="DeadEndFilling", choices=SOLVERS)
+    parser.add_argument(
+        "--output",
+        default="none",
+        choices=["png", "json", "none", "window"],
+        help="png: save a render, json: print one result line per maze, window: animate",
+    )
+    parser.add_argument("--png-file", help=f"PNG file name (default {OUTPUT_FILE}, or <maze>.png for several mazes)")
+    parser.add_argument("--repeat", type=positive_int, default=1, help="solve each maze this many times")
+    parser.add_argument("--race", nargs=2, metavar=("LEFT", "RIGHT"), choices=SOLVERS, help="race two solvers in a window")
+    parser.add_argument("--stats", metavar="FILE", help="append counters and phase times of every solve to this JSONL file (- for stdout)")
+    args = parser.parse_args(argv)
+
+    if args.stats:
+        logic.Solver.sink = stats.JsonlSink(args.stats)
+
+    for maze_file in args.mazes:
+        if args.stats:
+            logic.Solver.sink.fields["maze"] = maze_file
+        if args.race:
+            show_race(load_grid(maze_file), *args.race)
+            continue
+        if args.output == "window":
+            # Animate straight away; the solver's iter_search() does the solving
+            grid = load_grid(maze_file)
+            show_single(SOLVERS[args.solver](grid, *find_endpoints(grid)))
+            continue
+
+        solver, explored, timings = solve(maze_file, args.solver, args.repeat)
+        if args.output == "json":
+            print(json.dumps({
+                "maze": maze_file,
+                "solver": args.solver,
+                "path_length": len(solver.path),
+                "explored": len(explored),
+                "best_seconds": min(timings),
+                "mean_seconds": sum(timings) / len(timings),
+                "path": solver.path,
+            }))
+        elif args.output == "png":
+            if args.png_file:
+                output_file = args.png_file
+            elif len(args.mazes) == 1:
+                output_file = OUTPUT_FILE
+            else:
+                output_file = Path(maze_file).with_suffix(".png").name
+            save_png(solver, explored, output_file)
+        else:
+            cprint(
+                f"{maze_file}: {args.solver} path {len(solver.path)}, explored {len(explored)}, {min(timings):.4f}s",
+                "green",
+            )
+
+
+if __name__ == "__main__":
+    main()
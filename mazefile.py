@@ -0,0 +1,143 @@
+import argparse
+import struct
+import numpy as np
+from logic import Grid, OPEN, WALL
+
+# magic, version, packing, flags, rows, cols, start x/y, end x/y, seed
+HEADER = struct.Struct("<4sBBHIIiiiiQ")
+MAGIC = b"MAZE"
+VERSION = 1
+
+BYTES = 0  # One byte per cell, holding the text character
+BITS = 1  # One bit per cell (1 = walkable), every row padded to a whole byte
+
+HAS_SEED = 1
+
+
+class MazeFile:
+    """A binary maze file mapped into memory.
+
+    ``cells`` is a read-only ``(rows, cols)`` view straight onto the file: the
+    text characters for byte files, the packed walkable bits for bit files.
+    Nothing is read until it is touched.
+    """
+
+    def __init__(self, file_path):
+        with open(file_path, "rb") as file:
+            header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{file_path} is too short to be a maze file")
+
+        magic, version, packing, flags, rows, cols, sx, sy, ex, ey, seed = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or packing not in (BYTES, BITS):
+            raise ValueError(f"{file_path} is not a version {VERSION} maze file")
+
+        self.file_path = file_path
+        self.packing = packing
+        self.rows = rows
+        self.cols = cols
+        self.start = (sx, sy) if sx >= 0 else None
+        self.end = (ex, ey) if ex >= 0 else None
+        self.seed = seed if flags & HAS_SEED else None
+
+        row_bytes = cols if packing == BYTES else (cols + 7) // 8
+        self.cells = np.memmap(file_path, dtype=np.uint8, mode="r", offset=HEADER.size, shape=(rows, row_bytes))
+
+    def characters(self, top=0, bottom=None, left=0, right=None):
+        """The block ``[top:bottom, left:right]`` as an array of text characters."""
+        bottom = self.rows if bottom is None else bottom
+        right = self.cols if right is None else right
+        if self.packing == BYTES:
+            return np.asarray(self.cells[top:bottom, left:right])
+
+        first = left // 8
+        bits = np.unpackbits(self.cells[top:bottom, first : (right + 7) // 8], axis=1)
+        bits = bits[:, left - 8 * first : right - 8 * first]
+        chars = np.where(bits, OPEN, WALL).astype(np.uint8)
+        for cell, char in ((self.start, "S"), (self.end, "E")):
+            if cell and top <= cell[1] < bottom and left <= cell[0] < right:
+                chars[cell[1] - top, cell[0] - left] = ord(char)
+        return chars
+
+    def grid(self):
+        """Copy the maze into a padded ``Grid`` for the solvers."""
+        return Grid(self.characters())
+
+    def rows_text(self):
+        for y in range(self.rows):
+            yield self.characters(y, y + 1).tobytes().decode()
+
+
+def load(file_path):
+    return MazeFile(file_path)
+
+
+def _write_header(file, packing, rows, cols, start, end, seed):
+    sx, sy = start or (-1, -1)
+    ex, ey = end or (-1, -1)
+    flags = HAS_SEED if seed is not None else 0
+    file.write(HEADER.pack(MAGIC, VERSION, packing, flags, rows, cols, sx, sy, ex, ey, seed or 0))
+
+
+def _encode(row, packing):
+    row = np.frombuffer(row.encode(), dtype=np.uint8)
+    if packing == BYTES:
+        return row.tobytes()
+    if ((row >= ord("1")) & (row <= ord("9"))).any():
+        raise ValueError("terrain costs cannot be packed into bits; use byte packing")
+    return np.packbits(row != WALL).tobytes()
+
+
+def save(maze, file_path, seed=None, packing=BYTES):
+    """Write ``maze`` (a list of row strings) as a binary maze file."""
+    write_rows(maze, file_path, seed, packing)
+
+
+def write_rows(rows, file_path, seed=None, packing=BYTES):
+    """Stream row strings into a binary maze file, one row in memory at a time."""
+    with open(file_path, "wb") as file:
+        _write_header(file, packing, 0, 0, None, None, seed)
+        start = end = None
+        count = cols = 0
+        for row in rows:
+            row = row.strip()
+            if not row:
+                continue
+            if "S" in row and start is None:
+                start = (row.index("S"), count)
+            if "E" in row and end is None:
+                end = (row.index("E"), count)
+            if count and len(row) != cols:
+                raise ValueError(f"row {count} has {len(row)} cells, expected {cols}")
+            cols = len(row)
+            file.write(_encode(row, packing))
+            count += 1
+
+        # Dimensions and endpoints are only known once every row is written
+        file.seek(0)
+        _write_header(file, packing, count, cols, start, end, seed)
+
+
+def txt_to_bin(txt_path, bin_path, seed=None, packing=BYTES):
+    with open(txt_path, "r") as file:
+        write_rows(file, bin_path, seed, packing)
+
+
+def bin_to_txt(bin_path, txt_path):
+    with open(txt_path, "w") as file:
+        for row in load(bin_path).rows_text():
+            file.write(row + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert mazes between .txt and the binary .maze format.")
+    parser.add_argument("source")
+    parser.add_argument("destination")
+    parser.add_argument("--bits", action="store_true", help="pack one bit per cell instead of one byte")
+    parser.add_argument("--seed", type=int, help="generator seed to record in the header")
+    args = parser.parse_args()
+
+    if args.source.endswith(".txt"):
+        txt_to_bin(args.source, args.destination, args.seed, BITS if args.bits else BYTES)
+    else:
+        bin_to_txt(args.source, args.destination)
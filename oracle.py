@@ -0,0 +1,175 @@
+import hashlib
+import os
+import weakref
+from collections import OrderedDict, defaultdict
+import numpy as np
+from logic import Solver, descend, distance_field
+
+UNREACHED = np.iinfo(np.uint32).max
+
+_hashes = weakref.WeakKeyDictionary()
+
+
+def maze_hash(grid):
+    """Content hash of a grid, computed once per ``Grid`` object."""
+    digest = _hashes.get(grid)
+    if digest is None:
+        digest = _hashes[grid] = hashlib.blake2b(grid.cells, digest_size=16).hexdigest()
+    return digest
+
+
+class DistanceOracle:
+    """Cache of reverse distance fields, one per (maze content, goal).
+
+    A field is a single BFS from the goal stored as a flat uint32 array over the
+    grid (``UNREACHED`` where the goal cannot be reached). Once it exists, the
+    shortest path from any start is a greedy descent costing O(path length).
+    A set of goals gets one multi-source field, which leads to the nearest.
+    At most ``capacity`` fields stay in memory; the least recently used one is
+    evicted, and written to ``spill_dir`` first when one is given so it can be
+    memory-mapped back instead of recomputed.
+    """
+
+    def __init__(self, capacity=8, spill_dir=None):
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        self._fields = OrderedDict()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, key):
+        digest, goal = key
+        if isinstance(goal, tuple):
+            goal = hashlib.blake2b(repr(goal).encode(), digest_size=8).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}-{goal}.npy")
+
+    def field(self, grid, goal):
+        """The distance field towards ``goal`` (an ``(x, y)`` cell) over ``grid``."""
+        return self._field(grid, grid.index(goal))
+
+    def _field(self, grid, goal):
+        """Field towards a grid index, or towards the nearest of a sorted tuple of them."""
+        if grid.weighted:
+            raise ValueError("distance fields count steps; weighted mazes are not supported")
+        key = (maze_hash(grid), goal)
+        field = self._fields.get(key)
+        if field is not None:
+            self._fields.move_to_end(key)
+            return field
+
+        if self.spill_dir and os.path.exists(self._spill_path(key)):
+            field = np.load(self._spill_path(key), mmap_mode="r")
+        else:
+            sources = goal if isinstance(goal, tuple) else [goal]
+            field = distance_field(grid, sources).astype(np.uint32)  # -1 wraps to UNREACHED
+
+        self._fields[key] = field
+        if len(self._fields) > self.capacity:
+            old_key, old_field = self._fields.popitem(last=False)
+            if self.spill_dir and not os.path.exists(self._spill_path(old_key)):
+                np.save(self._spill_path(old_key), old_field)
+        return field
+
+    def distance(self, grid, start, goal):
+        d = self.field(grid, goal)[grid.index(start)]
+        return None if d == UNREACHED else int(d)
+
+    def path(self, grid, start, goal):
+        """Shortest path from ``start`` to ``goal`` as ``(x, y)`` cells, or [] if there is none."""
+        field = self.field(grid, goal)
+        start = grid.index(start)
+        if field[start] == UNREACHED:
+            return []
+        return [grid.coords(i) for i in descend(grid, field, start)]
+
+    def paths(self, grid, pairs):
+        """Shortest paths for many ``(start, end)`` pairs over one grid, in input order.
+
+        Pairs are grouped by a shared endpoint, largest groups first, and each
+        group is answered from the one field of that endpoint; fields do not
+        care which way they are walked. N queries over K distinct endpoints
+        cost K searches plus N path walks. Unreachable pairs get [].
+        """
+        pairs = list(pairs)
+        groups = defaultdict(list)
+        for n, (start, end) in enumerate(pairs):
+            groups[end].append((n, start, False))
+            if start != end:
+                groups[start].append((n, end, True))
+
+        paths = [None] * len(pairs)
+        for shared, members in sorted(groups.items(), key=lambda group: -len(group[1])):
+            members = [member for member in members if paths[member[0]] is None]
+            if not members:
+                continue
+            field = self.field(grid, shared)
+            for n, other, reverse in members:
+                other = grid.index(other)
+                if field[other] == UNREACHED:
+                    paths[n] = []
+                    continue
+                path = [grid.coords(i) for i in descend(grid, field, other)]
+                paths[n] = path[::-1] if reverse else path
+        return paths
+
+    def nearest(self, grid, start, goals):
+        """The closest of ``goals`` to ``start`` and the path to it, or ``(None, [])``.
+
+        All goals share one multi-source field, so asking again from other
+        starts only walks their paths.
+        """
+        field = self._field(grid, tuple(sorted({grid.index(goal) for goal in goals})))
+        start = grid.index(start)
+        if field[start] == UNREACHED:
+            return None, []
+        path = [grid.coords(i) for i in descend(grid, field, start)]
+        return path[-1], path
+
+
+class OracleSolver(Solver):
+    """Solver that answers from a shared ``DistanceOracle``.
+
+    The first query towards a goal runs one BFS; every later query towards the
+    same goal in the same maze only walks its path. Nothing is explored.
+    """
+
+    unit_cost = True
+    oracle = DistanceOracle()
+
+    def expand(self):
+        self.path = self.oracle.path(self.grid, self.start, self.end)
+        yield from ()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+    import time
+    from main import find_endpoints, load_grid
+
+    def cell(text):
+        x, y = text.split(",")
+        return int(x), int(y)
+
+    parser = argparse.ArgumentParser(description="Answer many path queries over one maze from shared distance fields.")
+    parser.add_argument("maze", help="maze .txt or binary .maze file")
+    parser.add_argument("--pairs", help="file of queries, one 'sx sy ex ey' per line")
+    parser.add_argument("--nearest", nargs="+", type=cell, metavar="X,Y", help="report the closest of these exits")
+    parser.add_argument("--start", type=cell, metavar="X,Y", help="start for --nearest (default the maze's S)")
+    args = parser.parse_args()
+
+    grid = load_grid(args.maze)
+    oracle = DistanceOracle()
+    began = time.perf_counter()
+    if args.pairs:
+        with open(args.pairs, "r") as file:
+            pairs = [tuple(map(int, line.split())) for line in file if line.strip()]
+        pairs = [((sx, sy), (ex, ey)) for sx, sy, ex, ey in pairs]
+        for (start, end), path in zip(pairs, oracle.paths(grid, pairs)):
+            print(json.dumps({"start": start, "end": end, "path_length": len(path), "path": path}))
+    if args.nearest:
+        start = args.start or find_endpoints(grid)[0]
+        goal, path = oracle.nearest(grid, start, args.nearest)
+        print(json.dumps({"start": start, "nearest": goal, "path_length": len(path), "path": path}))
+    print(f"answered in {time.perf_counter() - began:.3f}s", file=sys.stderr)
@@ -0,0 +1,53 @@
+import numpy as np
+
+WHITE = (255, 255, 255)
+
+
+def cell_image(grid, colors, default=WHITE):
+    """One RGB pixel per grid cell, coloured through a lookup table on the cell byte.
+
+    The image keeps the grid's wall padding so flat grid indices can be used to
+    paint it directly; ``upscale`` crops it off again.
+    """
+    table = np.empty((256, 3), dtype=np.uint8)
+    table[:] = default
+    for cell, color in colors.items():
+        table[ord(cell)] = color
+    codes = np.frombuffer(grid.cells, dtype=np.uint8)
+    return table[codes].reshape(grid.rows + 2, grid.stride, 3)
+
+
+def paint(image, indices, color):
+    image.reshape(-1, 3)[np.asarray(indices, dtype=np.intp)] = color
+
+
+def upscale(image, cell_size):
+    """Crop the padding and blow every cell up to ``cell_size`` pixels, in (x, y) order."""
+    image = image[1:-1, 1:-1]
+    image = np.repeat(np.repeat(image, cell_size, axis=0), cell_size, axis=1)
+    return image.transpose(1, 0, 2)
+
+
+def blit(surface, image, cell_size):
+    import pygame
+
+    pygame.surfarray.blit_array(surface, upscale(image, cell_size))
+
+
+def to_surface(image, cell_size):
+    import pygame
+
+    return pygame.surfarray.make_surface(upscale(image, cell_size))
+
+
+def fill_cells(surface, grid, indices, color, cell_size):
+    """Colour many cells of an already drawn surface in one vectorized write."""
+    import pygame
+
+    mask = np.zeros(grid.size, dtype=bool)
+    mask[np.asarray(indices, dtype=np.intp)] = True
+    mask = mask.reshape(grid.rows + 2, grid.stride)[1:-1, 1:-1]
+    mask = np.repeat(np.repeat(mask, cell_size, axis=0), cell_size, axis=1)
+    pixels = pygame.surfarray.pixels3d(surface)
+    pixels[mask.T] = color
+    del pixels  # Unlock the surface
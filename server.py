@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from logic import Grid
+from main import SOLVERS, find_endpoints, load_grid
+
+HOST = "127.0.0.1"
+PORT = 8765
+LINE_LIMIT = 64 * 1024 * 1024  # Longest request line, enough for uploading a 4000x4000 maze
+
+
+def solve(solver_name, start=None, end=None, maze=None, file=None):
+    """Solve one maze in a worker process, given as a list of row strings or a file path."""
+    grid = Grid(maze) if file is None else load_grid(file)
+    if start is None or end is None:
+        found_start, found_end = find_endpoints(grid)
+        start, end = start or found_start, end or found_end
+    for x, y in (start, end):
+        if not (0 <= x < grid.cols and 0 <= y < grid.rows):
+            raise ValueError(f"({x}, {y}) is outside the {grid.cols}x{grid.rows} maze")
+
+    began = time.perf_counter()
+    path, explored = SOLVERS[solver_name](grid, start, end).search()
+    return {
+        "solver": solver_name,
+        "start": start,
+        "end": end,
+        "path_length": len(path),
+        "explored": len(explored),
+        "seconds": time.perf_counter() - began,
+        "path": path,
+    }
+
+
+def maze_key(request):
+    """Identity of the maze in ``request``: a content hash, or the file's path, size and mtime."""
+    if "maze" in request:
+        return hashlib.sha1("\n".join(request["maze"]).encode()).hexdigest()
+    stat = os.stat(request["file"])
+    return os.path.realpath(request["file"]), stat.st_size, stat.st_mtime_ns
+
+
+def check_rows(maze):
+    if not isinstance(maze, list) or not maze or not all(isinstance(row, str) for row in maze):
+        raise ValueError("'maze' must be a non-empty list of row strings")
+    if any(len(row) != len(maze[0]) for row in maze):
+        raise ValueError("all rows of 'maze' must have the same length")
+
+
+def endpoint(value):
+    return tuple(value) if value is not None else None
+
+
+class SolveServer:
+    """Solve mazes sent as JSON lines over TCP, on a pool of worker processes.
+
+    A request is one JSON object per line with a ``solver`` name and either
+    ``maze`` (the rows as strings) or ``file`` (a maze file the server can
+    read), plus optional ``start``/``end`` cells and an ``id`` that is echoed
+    back. Requests on one connection are handled concurrently, so responses
+    may arrive out of order.
+
+    Identical requests (same maze, solver and endpoints) that arrive while one
+    is being solved wait for that result instead of solving again, and the
+    last ``cache_size`` results are kept in an LRU cache. Every response says
+    where its result came from in ``source``: "solved", "coalesced" or "cache".
+    """
+
+    def __init__(self, workers=None, cache_size=256):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.in_flight = {}
+        self.counters = {"requests": 0, "solved": 0, "coalesced": 0, "cached": 0, "errors": 0}
+
+    async def solve(self, request):
+        """The response to one request, as a dict."""
+        self.counters["requests"] += 1
+        response = {"id": request.get("id")}
+        try:
+            solver_name = request["solver"]
+            if solver_name not in SOLVERS:
+                raise ValueError(f"unknown solver {solver_name!r}")
+            if ("maze" in request) == ("file" in request):
+                raise ValueError("send exactly one of 'maze' and 'file'")
+            if "maze" in request:
+                check_rows(request["maze"])
+            start, end = endpoint(request.get("start")), endpoint(request.get("end"))
+            key = (maze_key(request), solver_name, start, end)
+        except (KeyError, TypeError, ValueError, OSError) as error:
+            self.counters["errors"] += 1
+            return {**response, "error": str(error)}
+
+        result = self.cache.get(key)
+        if result is not None:
+            self.cache.move_to_end(key)
+            self.counters["cached"] += 1
+            return {**response, **result, "source": "cache"}
+
+        future = self.in_flight.get(key)
+        if future is not None:
+            source = "coalesced"
+        else:
+            source = "solved"
+            work = partial(solve, solver_name, start, end, maze=request.get("maze"), file=request.get("file"))
+            future = asyncio.get_running_loop().run_in_executor(self.pool, work)
+            self.in_flight[key] = future
+            future.add_done_callback(lambda done: self.store(key, done))
+
+        try:
+            # Shielded, so a client going away does not cancel the solve for everyone else
+            result = await asyncio.shield(future)
+        except Exception as error:  # Whatever the worker raised goes back to the client
+            self.counters["errors"] += 1
+            return {**response, "error": str(error)}
+        self.counters[source] += 1
+        return {**response, **result, "source": source}
+
+    def store(self, key, future):
+        del self.in_flight[key]
+        if future.cancelled() or future.exception() is not None or not self.cache_size:
+            return
+        self.cache[key] = future.result()
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    async def handle(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(line):
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("a request must be a JSON object")
+            except ValueError as error:
+                self.counters["errors"] += 1
+                response = {"id": None, "error": f"bad request: {error}"}
+            else:
+                response = await self.solve(request)
+            async with lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    task = asyncio.create_task(respond(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except (ConnectionError, ValueError):
+            pass  # Client went away, or sent a line longer than LINE_LIMIT
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        """Start listening; returns the ``asyncio.Server``."""
+        return await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+class Client:
+    """Asyncio client for a ``SolveServer``; several ``solve`` calls can be awaited at once.
+
+    Use it as ``async with Client() as client: await client.solve("aStar", file="maze.txt")``.
+    """
+
+    def __init__(self, host=HOST, port=PORT):
+        self.host = host
+        self.port = port
+        self.next_id = 0
+        self.pending = {}
+
+    async def __aenter__(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, limit=LINE_LIMIT)
+        self.receiver = asyncio.create_task(self.receive())
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.receiver.cancel()
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def receive(self):
+        while line := await self.reader.readline():
+            response = json.loads(line)
+            future = self.pending.pop(response["id"], None)
+            if future is not None:
+                future.set_result(response)
+        for future in self.pending.values():
+            future.set_exception(ConnectionError("server closed the connection"))
+
+    async def solve(self, solver, maze=None, file=None, start=None, end=None):
+        """Send one request and wait for its response dict."""
+        self.next_id += 1
+        request = {"id": self.next_id, "solver": solver}
+        if maze is not None:
+            request["maze"] = maze
+        if file is not None:
+            request["file"] = file
+        if start is not None:
+            request["start"], request["end"] = start, end
+        future = self.pending[self.next_id] = asyncio.get_running_loop().create_future()
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        return await future
+
+
+async def serve_forever(host, port, workers, cache_size):
+    server = SolveServer(workers, cache_size)
+    try:
+        listener = await server.serve(host, port)
+        print(f"Serving on {host}:{port}", flush=True)
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+async def query(host, port, solver, files):
+    async with Client(host, port) as client:
+        for response in await asyncio.gather(*(client.solve(solver, file=file) for file in files)):
+            response.pop("path", None)
+            print(json.dumps(response))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve maze solving over a local JSON-lines TCP socket.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, help="solver processes (default: all cores)")
+    parser.add_argument("--cache-size", type=int, default=256, help="results kept in the LRU cache")
+    parser.add_argument("--query", nargs="+", metavar="MAZE", help="send these maze files to a running server instead")
+    parser.add_argument("--solver", default="aStar", choices=SOLVERS, help="solver for --query")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.query:
+            asyncio.run(query(args.host, args.port, args.solver, [os.path.abspath(file) for file in args.query]))
+        else:
+            asyncio.run(serve_forever(args.host, args.port, args.workers, args.cache_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
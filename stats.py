@@ -0,0 +1,47 @@
+import json
+import sys
+
+
+class Stats:
+    """In-memory sink: keeps every search record and sums them per solver.
+
+    Install it for all solvers with ``logic.Solver.sink = Stats()``, or for
+    one solver by setting its ``sink`` attribute.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def record(self, record):
+        self.records.append(record)
+
+    def totals(self):
+        """Per solver name: number of searches, summed seconds, counters and phase times."""
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault(record["solver"], {"searches": 0, "seconds": 0.0, "counters": {}, "phases": {}})
+            total["searches"] += 1
+            total["seconds"] += record["seconds"]
+            for group in ("counters", "phases"):
+                for name, value in record[group].items():
+                    total[group][name] = total[group].get(name, 0) + value
+        return totals
+
+    def clear(self):
+        self.records.clear()
+
+
+class JsonlSink:
+    """Sink that writes one JSON line per search to a file (or stdout for ``-``)."""
+
+    def __init__(self, file_path, **fields):
+        self.file = sys.stdout if file_path == "-" else open(file_path, "a")
+        self.fields = fields  # Extra fields added to every line, e.g. the maze file
+
+    def record(self, record):
+        self.file.write(json.dumps({**self.fields, **record}) + "\n")
+        self.file.flush()
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
@@ -0,0 +1,77 @@
+import random
+import sys
+import pytest
+import gen
+import kernels
+from logic import Grid
+from main import SOLVERS
+
+KERNEL_SOLVERS = ["aStar", "Dijkstra", "DeadEndFilling"]
+
+
+def solve(grid, solver_name, start, end, enabled):
+    kernels.enabled = enabled
+    solver = SOLVERS[solver_name](grid, start, end)
+    path, explored = solver.search()
+    assert solver.use_kernels == enabled
+    return path, list(explored.indices), solver.counters
+
+
+@pytest.fixture(autouse=True)
+def restore_kernels(monkeypatch):
+    monkeypatch.setattr(kernels, "MIN_CELLS", 0)  # Use the kernels on the small test mazes too
+    saved = kernels.enabled
+    yield
+    kernels.enabled = saved
+
+
+@pytest.mark.parametrize("solver_name", KERNEL_SOLVERS)
+@pytest.mark.parametrize("generator", sorted(gen.GENERATORS))
+@pytest.mark.parametrize("terrain", [0, 5, 9])
+def test_kernels_match_python(solver_name, generator, terrain):
+    """Paths, expansion order and counters are identical with and without the kernels.
+
+    Without Numba the kernels run interpreted, so the mazes are kept small.
+    Terrain mazes exercise the A* kernel with ``scale = min_cost``.
+    """
+    for seed in (1, 2):
+        maze = gen.GENERATORS[generator](31, 41, seed)
+        if terrain:
+            maze = gen.add_terrain(maze, terrain, seed=seed)
+        grid = Grid(maze)
+        cells = [grid.coords(i) for i in range(grid.size) if grid.walkable[i]]
+        rng = random.Random(seed)
+        pairs = [(grid.find("S"), grid.find("E"))] + [(rng.choice(cells), rng.choice(cells)) for _ in range(3)]
+        for start, end in pairs:
+            python = solve(grid, solver_name, start, end, False)
+            assert python[0], (start, end)
+            assert solve(grid, solver_name, start, end, True) == python, (seed, start, end)
+
+
+def test_broken_numba_falls_back_to_python(monkeypatch):
+    """An installed Numba that fails to import turns the kernels off instead of failing the search."""
+    monkeypatch.setitem(sys.modules, "numba", None)  # Makes "import numba" raise ImportError
+    monkeypatch.setattr(kernels, "AVAILABLE", True)
+    monkeypatch.setattr(kernels, "_compiled", False)
+    kernels.enabled = True
+    grid = Grid(gen.generate(31, 41, 1))
+    start, end = grid.find("S"), grid.find("E")
+    expected = solve(grid, "Dijkstra", start, end, False)
+
+    kernels.enabled = True
+    with pytest.warns(UserWarning, match="Numba could not be imported"):
+        solver = SOLVERS["Dijkstra"](grid, start, end)
+        path, explored = solver.search()
+    assert (path, list(explored.indices), solver.counters) == expected
+    assert not kernels.enabled and not solver.use_kernels
+
+
+def test_small_grids_skip_the_kernels(monkeypatch):
+    monkeypatch.setattr(kernels, "MIN_CELLS", 10_000)
+    kernels.enabled = True
+    grid = Grid(gen.generate(31, 41, 1))
+    start, end = grid.find("S"), grid.find("E")
+    for solver_name in KERNEL_SOLVERS + ["RightHandRule"]:
+        solver = SOLVERS[solver_name](grid, start, end)
+        solver.search()
+        assert not solver.use_kernels
@@ -0,0 +1,59 @@
+import random
+import pytest
+import gen
+import mazefile
+from logic import Grid, aStar
+from tiles import TileIndex
+
+
+def blocked_maze(height, width, seed):
+    """A seeded maze with some open cells walled up, so that not every pair is connected."""
+    rng = random.Random(seed)
+    rows = [list(row) for row in gen.generate(height, width, seed)]
+    for row in rows:
+        for x, cell in enumerate(row):
+            if cell == "." and rng.random() < 0.15:
+                row[x] = "#"
+    return ["".join(row) for row in rows]
+
+
+def assert_valid(grid, path, start, end):
+    assert path[0] == start and path[-1] == end
+    for (ax, ay), (bx, by) in zip(path, path[1:]):
+        assert abs(ax - bx) + abs(ay - by) == 1
+    assert all(grid.walkable[grid.index(cell)] for cell in path)
+
+
+@pytest.mark.parametrize("tile_size", [2, 3, 5])
+@pytest.mark.parametrize("height, width, seed", [(15, 21, 1), (23, 17, 2), (31, 31, 3)])
+def test_query_matches_astar(tmp_path, tile_size, height, width, seed):
+    maze = blocked_maze(height, width, seed)
+    maze_path = str(tmp_path / "maze.maze")
+    mazefile.save(maze, maze_path)
+    index_path = str(tmp_path / "index.npz")
+    TileIndex(maze_path, tile_size, cache_tiles=4).save(index_path)
+    index = TileIndex.load(index_path, maze_path, cache_tiles=4)
+
+    grid = Grid(maze)
+    cells = [grid.coords(i) for i in range(grid.size) if grid.walkable[i]]
+    rng = random.Random(seed)
+    pairs = [(rng.choice(cells), rng.choice(cells)) for _ in range(40)]
+    pairs.append((cells[0], cells[0]))
+
+    disconnected = 0
+    for start, end in pairs:
+        path, _ = index.query(start, end)
+        expected, _ = aStar(grid, start, end).search()
+        assert len(path) == len(expected), (start, end)
+        if expected:
+            assert_valid(grid, path, start, end)
+        else:
+            disconnected += 1
+    assert disconnected  # The blocked cells must have split the maze somewhere
+
+
+def test_weighted_mazes_are_rejected(tmp_path):
+    maze_path = str(tmp_path / "terrain.maze")
+    mazefile.save(gen.add_terrain(gen.generate(15, 21, 1), 5, seed=1), maze_path)
+    with pytest.raises(ValueError, match="does not support weighted mazes"):
+        TileIndex(maze_path, 5)
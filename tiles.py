@@ -0,0 +1,352 @@
+import heapq
+from array import array
+from collections import OrderedDict, deque
+import numpy as np
+import mazefile
+from logic import Grid, WALL
+
+
+def _bfs(grid, source, targets=()):
+    """Breadth-first distances (-1 = unreached) and parents over a small grid.
+
+    Stops early once every index in ``targets`` has been reached.
+    """
+    walkable = grid.walkable
+    offsets = grid.offsets
+    distance = array("i", [-1]) * grid.size
+    parent = array("i", [-1]) * grid.size
+    distance[source] = 0
+    remaining = set(targets)
+    remaining.discard(source)
+    queue = deque([source])
+    while queue and (remaining or not targets):
+        current = queue.popleft()
+        step = distance[current] + 1
+        for offset in offsets:
+            neighbor = current + offset
+            if walkable[neighbor] and distance[neighbor] < 0:
+                distance[neighbor] = step
+                parent[neighbor] = current
+                remaining.discard(neighbor)
+                queue.append(neighbor)
+    return distance, parent
+
+
+class TileIndex:
+    """Hierarchical (HPA*) index over a binary maze file split into square tiles.
+
+    A portal is a walkable cell on a tile border whose neighbour across the
+    border is walkable too. For every tile the distances between its portals
+    (staying inside the tile) are stored as a small matrix, and portals on
+    either side of a border are joined with unit edges. Any shortest path can
+    be cut where it crosses tile borders, so shortest paths in this graph have
+    exactly the length of shortest paths in the maze.
+
+    Tiles are read from the memory-mapped file on demand and kept in an LRU
+    cache of ``cache_tiles`` entries, so only the portal graph and a bounded
+    number of tiles are ever resident. The graph is built once; ``save`` and
+    ``load`` let other processes answer ``query`` calls without rebuilding it.
+    """
+
+    def __init__(self, maze, tile_size=64, cache_tiles=64):
+        self._open(maze, tile_size, cache_tiles)
+        self.build()
+
+    def _open(self, maze, tile_size, cache_tiles):
+        self.maze = maze if isinstance(maze, mazefile.MazeFile) else mazefile.load(maze)
+        self.rows, self.cols = self.maze.rows, self.maze.cols
+        self.tile_size = tile_size
+        self.tile_rows = -(-self.rows // tile_size)
+        self.tile_cols = -(-self.cols // tile_size)
+        self.cache_tiles = cache_tiles
+        self._cache = OrderedDict()
+
+        count = self.tile_rows * self.tile_cols
+        self.portals = [np.empty(0, dtype=np.int64)] * count  # Sorted global cell indices
+        self.distances = [np.empty((0, 0), dtype=np.int32)] * count  # -1 where unreachable
+        # Portal pairs next to each other in neighbouring tiles, both ways round, sorted by the first
+        self.across_from = np.empty(0, dtype=np.int64)
+        self.across_to = np.empty(0, dtype=np.int64)
+
+    def save(self, file_path):
+        """Write the portal graph to an ``.npz`` file."""
+        counts = np.array([len(cells) for cells in self.portals], dtype=np.int64)
+        with open(file_path, "wb") as file:
+            np.savez(
+                file,
+                shape=np.array([self.rows, self.cols, self.tile_size], dtype=np.int64),
+                counts=counts,
+                portals=np.concatenate(self.portals) if len(counts) else np.empty(0, dtype=np.int64),
+                distances=np.concatenate([d.ravel() for d in self.distances]).astype(np.int32),
+                across=np.stack([self.across_from, self.across_to], axis=1),
+            )
+
+    @classmethod
+    def load(cls, file_path, maze, cache_tiles=64):
+        """Read a portal graph written by ``save`` for the maze file ``maze``."""
+        with np.load(file_path) as data:
+            rows, cols, tile_size = data["shape"].tolist()
+            index = cls.__new__(cls)
+            index._open(maze, tile_size, cache_tiles)
+            if (index.rows, index.cols) != (rows, cols):
+                raise ValueError(f"{file_path} was built for a {cols}x{rows} maze")
+
+            counts = data["counts"]
+            portal_ends = np.cumsum(counts)
+            distance_ends = np.cumsum(counts * counts)
+            portals, distances = data["portals"], data["distances"]
+            for tile, count in enumerate(counts.tolist()):
+                if count:
+                    index.portals[tile] = portals[portal_ends[tile] - count : portal_ends[tile]]
+                    matrix = distances[distance_ends[tile] - count * count : distance_ends[tile]]
+                    index.distances[tile] = matrix.reshape(count, count)
+            index.set_across(data["across"][:, 0], data["across"][:, 1])
+        return index
+
+    # Cells are addressed by their global index y * cols + x
+
+    def cell(self, node):
+        x, y = node
+        return y * self.cols + x
+
+    def coords(self, cell):
+        y, x = divmod(cell, self.cols)
+        return x, y
+
+    def tile_of(self, cell):
+        y, x = divmod(cell, self.cols)
+        return (y // self.tile_size) * self.tile_cols + x // self.tile_size
+
+    def bounds(self, tile):
+        row, col = divmod(tile, self.tile_cols)
+        top, left = row * self.tile_size, col * self.tile_size
+        return top, min(top + self.tile_size, self.rows), left, min(left + self.tile_size, self.cols)
+
+    def tile(self, tile):
+        """The tile as a padded ``Grid``, loaded through the LRU cache."""
+        grid = self._cache.get(tile)
+        if grid is not None:
+            self._cache.move_to_end(tile)
+            return grid
+
+        top, bottom, left, right = self.bounds(tile)
+        grid = Grid(self.maze.characters(top, bottom, left, right))
+        self._cache[tile] = grid
+        if len(self._cache) > self.cache_tiles:
+            self._cache.popitem(last=False)
+        return grid
+
+    def local(self, tile, cell):
+        top, _, left, _ = self.bounds(tile)
+        y, x = divmod(cell, self.cols)
+        return self.tile(tile).index((x - left, y - top))
+
+    def to_global(self, tile, index):
+        top, _, left, _ = self.bounds(tile)
+        x, y = self.tile(tile).coords(index)
+        return (y + top) * self.cols + x + left
+
+    def set_across(self, a, b):
+        """Store the border pairs ``a[i]``-``b[i]``, which must list both ways round."""
+        order = np.argsort(a, kind="stable")
+        self.across_from = np.asarray(a, dtype=np.int64)[order]
+        self.across_to = np.asarray(b, dtype=np.int64)[order]
+
+    def across(self, cell):
+        """Portals next to ``cell`` in neighbouring tiles."""
+        first = np.searchsorted(self.across_from, cell)
+        last = np.searchsorted(self.across_from, cell, side="right")
+        return self.across_to[first:last].tolist()
+
+    def build(self):
+        # One sequential pass over bands of tile_size rows: vertical borders
+        # inside each band, horizontal borders against the band above
+        size, cols = self.tile_size, self.cols
+        borders = np.arange(size, cols, size)
+        firsts, seconds = [], []
+        above = None
+        for top in range(0, self.rows, size):
+            band = self.maze.characters(top, min(top + size, self.rows))
+            if ((band >= ord("1")) & (band <= ord("9"))).any():
+                raise ValueError("TileIndex does not support weighted mazes")  # Portal distances count steps
+            band = band != WALL
+            ys, ks = np.nonzero(band[:, borders - 1] & band[:, borders])
+            firsts.append((top + ys) * cols + borders[ks] - 1)
+            seconds.append(firsts[-1] + 1)
+            if above is not None:
+                xs = np.flatnonzero(above & band[0])
+                firsts.append((top - 1) * cols + xs)
+                seconds.append(firsts[-1] + cols)
+            above = band[-1]
+        firsts, seconds = np.concatenate(firsts), np.concatenate(seconds)
+        self.set_across(np.concatenate([firsts, seconds]), np.concatenate([seconds, firsts]))
+
+        # Every portal is in across_from once per neighbour across a border
+        cells = np.unique(self.across_from)
+        y, x = np.divmod(cells, cols)
+        tiles = (y // size) * self.tile_cols + x // size
+        order = np.argsort(tiles, kind="stable")  # cells is sorted, so each tile's portals stay sorted
+        cells, tiles = cells[order], tiles[order]
+        bounds = np.searchsorted(tiles, np.arange(len(self.portals) + 1))
+        for tile in np.flatnonzero(np.diff(bounds)).tolist():
+            self.portals[tile] = cells[bounds[tile] : bounds[tile + 1]]
+            self.distances[tile] = self.portal_distances(tile)
+
+    def portal_distances(self, tile):
+        cells = self.portals[tile]
+        local = [self.local(tile, cell) for cell in cells.tolist()]
+        grid = self.tile(tile)
+        matrix = np.empty((len(local), len(local)), dtype=np.int32)
+        for i, source in enumerate(local):
+            distance, _ = _bfs(grid, source, local)
+            matrix[i] = [distance[target] for target in local]
+        return matrix
+
+    def edges_from(self, tile, cell):
+        """Intra-tile edges from a cell of ``tile`` to the tile's portals, as a dict."""
+        cells = self.portals[tile]
+        if not len(cells):
+            return {}
+        slot = np.searchsorted(cells, cell)
+        if slot < len(cells) and cells[slot] == cell:
+            row = self.distances[tile][slot]
+        else:
+            local = [self.local(tile, portal) for portal in cells.tolist()]
+            distance, _ = _bfs(self.tile(tile), self.local(tile, cell), local)
+            row = [distance[target] for target in local]
+        return {portal: int(d) for portal, d in zip(cells.tolist(), row) if d > 0}
+
+    def refine(self, a, b):
+        """Cells after ``a`` up to and including ``b`` on a shortest path between them."""
+        tile = self.tile_of(a)
+        if tile != self.tile_of(b):
+            return [b]  # Neighbours across a tile border
+
+        source, target = self.local(tile, a), self.local(tile, b)
+        _, parent = _bfs(self.tile(tile), source, [target])
+        steps = []
+        while target != source:
+            steps.append(self.to_global(tile, target))
+            target = parent[target]
+        steps.reverse()
+        return steps
+
+
+    def query(self, start, end):
+        """Shortest path from ``start`` to ``end`` as ``(path, expanded portals)``.
+
+        A* runs over the portal graph with the Manhattan distance as heuristic,
+        which never overestimates a portal-to-portal distance; each abstract hop
+        is then refined inside its tile.
+        """
+        start, end = self.cell(start), self.cell(end)
+        start_tile, end_tile = self.tile_of(start), self.tile_of(end)
+        end_y, end_x = divmod(end, self.cols)
+        explored = []
+
+        # Hook the endpoints into the portal graph of their own tiles
+        start_edges = self.edges_from(start_tile, start)
+        end_edges = self.edges_from(end_tile, end)
+        if start_tile == end_tile:
+            target = self.local(end_tile, end)
+            distance, _ = _bfs(self.tile(start_tile), self.local(start_tile, start), [target])
+            if distance[target] >= 0:
+                start_edges[end] = distance[target]
+
+        def neighbors(cell):
+            if cell == start:
+                yield from start_edges.items()
+            else:
+                tile = self.tile_of(cell)
+                cells = self.portals[tile]
+                row = self.distances[tile][np.searchsorted(cells, cell)]
+                for portal, d in zip(cells.tolist(), row.tolist()):
+                    if d > 0:
+                        yield portal, d
+                if cell in end_edges:
+                    yield end, end_edges[cell]
+            for other in self.across(cell):
+                yield other, 1
+
+        def heuristic(cell):
+            y, x = divmod(cell, self.cols)
+            return abs(x - end_x) + abs(y - end_y)
+
+        g_score = {start: 0}
+        came_from = {start: None}
+        open_set = [(heuristic(start), 0, start)]
+        while open_set:
+            _, neg_g, current = heapq.heappop(open_set)
+            if -neg_g > g_score[current]:
+                continue
+            if current == end:
+                break
+            explored.append(self.coords(current))
+            for neighbor, d in neighbors(current):
+                g = g_score[current] + d
+                if neighbor not in g_score or g < g_score[neighbor]:
+                    g_score[neighbor] = g
+                    came_from[neighbor] = current
+                    heapq.heappush(open_set, (g + heuristic(neighbor), -g, neighbor))
+        else:
+            return [], explored
+
+        # Walk back through the portals, then refine each hop inside its tile
+        waypoints = []
+        while current is not None:
+            waypoints.append(current)
+            current = came_from[current]
+        waypoints.reverse()
+
+        cells = [start]
+        for a, b in zip(waypoints, waypoints[1:]):
+            cells += self.refine(a, b)
+        return [self.coords(cell) for cell in cells], explored
+
+
+class TiledSolver:
+    """Solve a binary maze file through a ``TileIndex``, without loading the whole maze.
+
+    ``search()`` returns the full cell path and the portals the abstract search
+    expanded, as ``(x, y)`` cells. Pass a prebuilt (or loaded) ``index`` to run
+    many queries against the same maze.
+    """
+
+    def __init__(self, maze, start=None, end=None, tile_size=64, cache_tiles=64, index=None):
+        self.index = index or TileIndex(maze, tile_size, cache_tiles)
+        self.start = start or self.index.maze.start
+        self.end = end or self.index.maze.end
+        self.explored = []
+        self.path = []
+
+    def search(self):
+        self.path, self.explored = self.index.query(self.start, self.end)
+        return self.path, self.explored
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import time
+
+    parser = argparse.ArgumentParser(description="Solve a binary .maze file tile by tile.")
+    parser.add_argument("maze", help="binary .maze file")
+    parser.add_argument("--tile-size", type=int, default=64)
+    parser.add_argument("--cache-tiles", type=int, default=64, help="tiles kept in memory at once")
+    parser.add_argument("--index", help="portal graph .npz file; built and saved here if it does not exist")
+    args = parser.parse_args()
+
+    began = time.perf_counter()
+    if args.index and os.path.exists(args.index):
+        index = TileIndex.load(args.index, args.maze, args.cache_tiles)
+    else:
+        index = TileIndex(args.maze, args.tile_size, args.cache_tiles)
+        if args.index:
+            index.save(args.index)
+    solver = TiledSolver(args.maze, index=index)
+    built = time.perf_counter()
+    path, explored = solver.search()
+    print(
+        f"path {len(path)}, portals expanded {len(explored)}, "
+        f"index {built - began:.2f}s, query {time.perf_counter() - built:.2f}s"
+    )